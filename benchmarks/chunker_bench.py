@@ -0,0 +1,40 @@
+"""
+Benchmarks gpt_core.chunker.split_message on multi-megabyte text, its invariants are
+checked over the same random inputs by tests/test_chunker.py.
+
+Usage: python benchmarks/chunker_bench.py [--megabytes 4] [--limit 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from chunker_inputs import random_text
+from gpt_core.chunker import split_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4)
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    text = random_text(rng, int(args.megabytes * 1024 * 1024))
+    start = time.perf_counter()
+    chunks = sum(1 for _ in split_message(text, args.limit))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(text) / 1024 / 1024:.1f} MB split into {chunks} chunks in {elapsed:.3f}s ({len(text) / 1024 / 1024 / elapsed:.1f} MB/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
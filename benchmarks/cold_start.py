@@ -0,0 +1,83 @@
+"""
+Measures how long the bot takes from a cold interpreter to having every cog loaded,
+the point where it would open the gateway connection.
+
+Every run is a fresh interpreter so nothing is cached between runs. "eager" also
+creates the ChatBot's ChatGPT right after loading, which is what startup used to do
+before the chatbot was deferred to its first command, "lazy" leaves it to first use.
+The database and Discord are never contacted, setup_hook is replaced by loading the
+extensions directly.
+
+Usage: python benchmarks/cold_start.py [--runs 5] [--profile]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+
+async def load_bot(eager, profile):
+    from main import CustomBot
+    from startup_profiler import StartupProfiler
+
+    bot = CustomBot()
+    profiler = StartupProfiler()
+    for ext in bot.initial_extensions:
+        await profiler.load(bot, ext)
+    if eager:
+        bot.get_cog("ChatBot").chat_gpt
+    if profile:
+        print(profiler.report())
+
+
+def child(mode, profile):
+    start = time.perf_counter()
+    asyncio.run(load_bot(mode == "eager", profile))
+    # Reported to the parent on the last line of output
+    print(f"{time.perf_counter() - start:.6f}")
+
+
+def run(mode, profile=False):
+    args = [sys.executable, __file__, "--child", mode]
+    if profile:
+        args.append("--profile")
+    start = time.perf_counter()
+    out = subprocess.run(args, capture_output=True, text=True, check=True, cwd=ROOT)
+    wall = time.perf_counter() - start
+    lines = out.stdout.strip().splitlines()
+    return wall, float(lines[-1]), "\n".join(lines[:-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--child", choices=["eager", "lazy"])
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.profile)
+        return
+
+    print(f"{'mode':<8}{'process ms':>14}{'import+setup ms':>18}")
+    for mode in ("eager", "lazy"):
+        # One warm up run so the first mode doesn't pay for cold disk caches
+        run(mode)
+        results = [run(mode) for _ in range(args.runs)]
+        wall = statistics.median(r[0] for r in results)
+        loaded = statistics.median(r[1] for r in results)
+        print(f"{mode:<8}{wall * 1000:>14.1f}{loaded * 1000:>18.1f}")
+
+    if args.profile:
+        print()
+        print(run("lazy", profile=True)[2])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Counts database round trips per SqlHelper call against an in-memory SQLite stand-in.
+
+The "before" numbers come from LegacySqlHelper, which replays the old
+guild_exists-then-statement pattern. Pass --rtt to add a simulated network
+round trip (in milliseconds) to every statement.
+
+Usage: python benchmarks/db_round_trips.py [--calls 1000] [--rtt 0.5]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db_helper import SqlHelper
+
+
+class CountingCursor:
+    """A sqlite3 cursor that speaks the MySQL dialect used by SqlHelper and counts round trips."""
+
+    def __init__(self, cursor, rtt):
+        self.cursor = cursor
+        self.rtt = rtt
+        self.round_trips = 0
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, sql, params=()):
+        self.round_trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+        sql = sql.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+        self.cursor.execute(sql, params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+
+def make_helper(cls, rtt):
+    con = sqlite3.connect(":memory:")
+    con.execute(
+        "CREATE TABLE guilds (id INTEGER PRIMARY KEY AUTOINCREMENT, guild_name TEXT NOT NULL, guild_id BIGINT NOT NULL UNIQUE, prefix TEXT NOT NULL DEFAULT '?', member_count_channel_id BIGINT)"
+    )
+    db = cls.__new__(cls)
+    db.db_con = con
+    db.db_cur = CountingCursor(con.cursor(), rtt)
+    return db
+
+
+class LegacySqlHelper(SqlHelper):
+    """The guild_exists-first versions of the hot SqlHelper methods."""
+
+    def get_prefix(self, guild_id):
+        if self.guild_exists(guild_id):
+            self.execute("SELECT prefix FROM guilds WHERE guild_id=%s", (guild_id,))
+            return self.fetchone()[0]
+        return None
+
+    def get_guild_channel_id(self, guild_id):
+        if self.guild_exists(guild_id):
+            self.execute(
+                "SELECT member_count_channel_id FROM guilds WHERE guild_id=%s",
+                (guild_id,),
+            )
+            return self.fetchone()[0]
+        return None
+
+    def set_prefix(self, guild_id, new_prefix):
+        if self.guild_exists(guild_id):
+            self.execute(
+                "UPDATE guilds SET prefix=%s WHERE guild_id=%s", (new_prefix, guild_id)
+            )
+            self.commit()
+            return True
+        return False
+
+    def add_guild(self, guild_name, guild_id):
+        if self.guild_exists(guild_id):
+            return False
+        self.execute(
+            "INSERT INTO guilds (guild_name, guild_id) VALUES (%s,%s)",
+            (guild_name, guild_id),
+        )
+        self.commit()
+        return True
+
+    def update_guild_name(self, guild_name, guild_id):
+        if self.guild_exists(guild_id):
+            self.execute(
+                "UPDATE guilds SET guild_name=%s WHERE guild_id=%s",
+                (guild_name, guild_id),
+            )
+            self.commit()
+            return True
+        return False
+
+    def delete_guild(self, guild_id):
+        if self.guild_exists(guild_id):
+            self.execute("DELETE FROM guilds WHERE guild_id=%s", (guild_id,))
+            self.commit()
+            return True
+        return False
+
+
+def run(cls, calls, rtt):
+    db = make_helper(cls, rtt)
+    workload = [
+        ("add_guild", lambda i: db.add_guild(f"guild {i}", i)),
+        ("get_prefix", lambda i: db.get_prefix(i)),
+        ("get_guild_channel_id", lambda i: db.get_guild_channel_id(i)),
+        ("set_prefix", lambda i: db.set_prefix(i, "!")),
+        ("update_guild_name", lambda i: db.update_guild_name(f"renamed {i}", i)),
+        ("get_prefix (missing)", lambda i: db.get_prefix(-i - 1)),
+        ("delete_guild", lambda i: db.delete_guild(i)),
+    ]
+    results = {}
+    for name, call in workload:
+        db.db_cur.round_trips = 0
+        start = time.perf_counter()
+        for i in range(calls):
+            call(i)
+        elapsed = time.perf_counter() - start
+        results[name] = (db.db_cur.round_trips / calls, elapsed / calls * 1e6)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--rtt", type=float, default=0.0, help="milliseconds")
+    args = parser.parse_args()
+
+    before = run(LegacySqlHelper, args.calls, args.rtt / 1000)
+    after = run(SqlHelper, args.calls, args.rtt / 1000)
+
+    print(f"{'method':<24}{'trips before':>14}{'trips after':>13}{'us before':>12}{'us after':>11}")
+    for name in before:
+        trips_b, us_b = before[name]
+        trips_a, us_a = after[name]
+        print(f"{name:<24}{trips_b:>14.1f}{trips_a:>13.1f}{us_b:>12.1f}{us_a:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
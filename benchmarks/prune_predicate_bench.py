@@ -0,0 +1,147 @@
+"""
+Measures how many messages per second the /prune predicate checks, compared with the
+old chain of flag checks that recompiled the invite regex and split every message.
+
+Messages are SimpleNamespace stand-ins for discord.Message, no connection is needed.
+
+Every check runs --repeat times, alternating with the other side, and the best run is
+reported so a busy machine doesn't decide the comparison.
+
+Usage: python benchmarks/prune_predicate_bench.py [--messages 50000] [--seed 0] [--repeat 7]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from prune_core.predicate import PrunePredicate
+
+WORDS = ["hello", "spam", "meeting", "lunch", "ok", "thanks", "deploy", "x" * 30]
+INVITE = "https://discord.gg/abc123"
+
+SCENARIOS = {
+    "no options": {},
+    "filter": {"filter": "spam"},
+    "invites": {"invites": True},
+    "user + bots": {"user_id": 7, "bots": True},
+    "everything": {
+        "attachments": True,
+        "bots": True,
+        "embeds": True,
+        "filter": "spam",
+        "invites": True,
+        "system": True,
+        "user_id": 7,
+    },
+}
+
+
+def make_messages(rng: random.Random, count: int):
+    messages = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(1, 40))
+        if rng.random() < 0.02:
+            words.append(INVITE)
+        author = SimpleNamespace(id=rng.randint(1, 50), bot=rng.random() < 0.1)
+        system = rng.random() < 0.01
+        messages.append(
+            SimpleNamespace(
+                author=author,
+                content=" ".join(words),
+                pinned=rng.random() < 0.01,
+                attachments=[object()] if rng.random() < 0.05 else [],
+                embeds=[object()] if rng.random() < 0.05 else [],
+                is_system=(lambda system=system: system),
+            )
+        )
+    return messages
+
+
+def legacy_check(
+    attachments=False,
+    bots=False,
+    embeds=False,
+    filter=None,
+    invites=False,
+    pinned=False,
+    system=False,
+    user_id=None,
+):
+    """The old per message chain, with user matching fixed so both sides agree."""
+
+    def contains_invites(content):
+        invite_filter = re.compile(
+            r"(https:\/\/)?(www\.)?(discord\.gg|discord\.me|discordapp\.com\/invite|discord\.com\/invite)\/([a-z0-9-.]+)?",
+            re.I,
+        )
+        return bool(invite_filter.search(content))
+
+    def check(msg):
+        if msg.pinned and not pinned:
+            return False
+        if not (
+            bots or user_id or filter or attachments or embeds or invites or system
+        ):
+            return True
+        if system and msg.is_system():
+            return True
+        if bots and msg.author.bot:
+            return True
+        if user_id and user_id == msg.author.id:
+            return True
+        if filter and filter in msg.content.split():
+            return True
+        if attachments and len(msg.attachments) > 0:
+            return True
+        if embeds and len(msg.embeds) > 0:
+            return True
+        if invites and contains_invites(msg.content):
+            return True
+        return False
+
+    return check
+
+
+def measure(check, messages):
+    start = time.perf_counter()
+    matched = sum(1 for msg in messages if check(msg))
+    return matched, len(messages) / (time.perf_counter() - start)
+
+
+def compare(before, after, messages, repeat):
+    best_b = best_a = 0
+    for _ in range(repeat):
+        matched_b, rate_b = measure(before, messages)
+        matched_a, rate_a = measure(after, messages)
+        best_b, best_a = max(best_b, rate_b), max(best_a, rate_a)
+    return matched_b, matched_a, best_b, best_a
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    messages = make_messages(random.Random(args.seed), args.messages)
+
+    print(f"{'scenario':<14}{'matched':>9}{'msgs/s before':>16}{'msgs/s after':>15}")
+    for name, options in SCENARIOS.items():
+        matched_b, matched_a, rate_b, rate_a = compare(
+            legacy_check(**options),
+            PrunePredicate(**options).matches,
+            messages,
+            args.repeat,
+        )
+        assert matched_a == matched_b, f"{name}: {matched_a} != {matched_b}"
+        print(f"{name:<14}{matched_a:>9}{rate_b:>16,.0f}{rate_a:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,112 @@
 import os
-from typing import Optional
+import time
+from typing import TYPE_CHECKING, Optional
 import discord
 from discord.app_commands import Choice
 from discord.ext import commands
 from discord import app_commands
-from gpt_core.gpt_mode import ChatGPT
-from gpt_core.gpt_utils import setup_personality
+from gpt_core.chunker import next_chunk, split_message
+from gpt_core.sessions import InputTooLong
+
+# Sent when a completion has no text, e.g. it was empty or stopped by the content filter
+EMPTY_REPLY = "The chatbot didn't come up with a response, please try again."
+
+if TYPE_CHECKING:
+    from gpt_core.gpt_mode import ChatGPT
+
+
+class StreamingReply:
+    """
+    Progressively edits followup messages as a streamed chatbot response arrives.
+
+    ...
+
+    Attributes
+    ----------
+    interaction : discord.Interaction
+        The deferred interaction to send followup messages to
+    edit_interval : float
+        Minimum seconds between edits of the same message, keeps edits under Discord's rate limit
+    char_limit : int
+        Maximum number of characters per message before continuing in a new one
+    sent : int
+        Number of messages sent so far
+
+    Methods
+    -------
+    write(text)
+        Add streamed text to the reply, editing the current message if enough time has passed
+    finish()
+        Flush any text that hasn't been shown yet, or tell the user there was none
+    """
+
+    def __init__(
+        self,
+        interaction: discord.Interaction,
+        edit_interval: float = 1.0,
+        char_limit: int = 2000,
+    ):
+        self.interaction = interaction
+        self.edit_interval = edit_interval
+        self.char_limit = char_limit
+        self.sent = 0
+
+        self._text = ""
+        self._fence = None
+        self._shown = ""
+        self._message = None
+        self._last_edit = 0.0
+
+    async def _show(self, content: str):
+        if content == self._shown or not content.strip():
+            return
+        if self._message is None:
+            self._message = await self.interaction.followup.send(content=content)
+            self.sent += 1
+        else:
+            await self._message.edit(content=content)
+        self._shown = content
+        self._last_edit = time.monotonic()
+
+    async def write(self, text: str):
+        """
+        Add streamed text to the reply, editing the current message if enough time has passed
+
+        ...
+
+        Parameters
+        ----------
+        text : str
+            The next piece of the response
+        """
+        self._text += text
+
+        # Finish the current message at a natural boundary and continue the rest in a new one
+        while len(self._content()) > self.char_limit:
+            chunk, position, self._fence = next_chunk(
+                self._text, 0, self._fence, self.char_limit
+            )
+            await self._show(chunk)
+            self._text = self._text[position:]
+            self._message = None
+            self._shown = ""
+
+        if time.monotonic() - self._last_edit >= self.edit_interval:
+            await self._show(self._content())
+
+    def _content(self) -> str:
+        # Reopen a code block that the previous message had to close
+        return f"{self._fence}\n{self._text}" if self._fence else self._text
+
+    async def finish(self):
+        """
+        Flush any text that hasn't been shown yet, or tell the user there was none
+        """
+        await self._show(self._content())
+        # The deferred interaction keeps "thinking" until a followup is sent
+        if self.sent == 0:
+            await self.interaction.followup.send(content=EMPTY_REPLY)
+            self.sent += 1
 
 
 class ChatBot(commands.Cog):
@@ -16,7 +117,18 @@ class ChatBot(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.chat_gpt = ChatGPT()
+        self._chat_gpt = None
+
+    @property
+    def chat_gpt(self) -> "ChatGPT":
+        """
+        The chatbot, created on first use so openai and its settings aren't loaded at startup
+        """
+        if self._chat_gpt is None:
+            from gpt_core.gpt_mode import ChatGPT
+
+            self._chat_gpt = ChatGPT()
+        return self._chat_gpt
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -30,27 +142,34 @@ class ChatBot(commands.Cog):
     @app_commands.describe(input="[STRING] Ask or tell the chatbot something")
     async def chatbot_text(self, interaction: discord.Interaction, input: str):
         await interaction.response.defer()
-        response = self.chat_gpt.gpt_text(input)
-        # embed = discord.Embed(color=discord.Color.blue())
-        # embed.add_field(name="\u2800", value=f"{response}", inline=False)
-        # print(f"\n{response}\n")
-        # print(response)
-
-        # TODO: Implement better workaround for handling reponses that exceed discord char limit
-        # Consider between pages with nav view or chain msgs with better formatting
-        resp_len = len(response)
-        discord_char_limit = 1800
-        if resp_len > discord_char_limit:
-            # Back up until space
-            while response[discord_char_limit - 1] != " ":
-                discord_char_limit -= 1
-            split_response = list()
-            split_response.append(f"{response[:discord_char_limit]}")
-            split_response.append(f"{response[discord_char_limit:]}")
-            await interaction.followup.send(content=split_response[0])
-            await interaction.followup.send(content=split_response[1])
-        else:
-            await interaction.followup.send(content=response)
+        session_key = self.chat_gpt.session_key(
+            interaction.channel_id, interaction.user.id
+        )
+
+        try:
+            # Show the response while it's being generated
+            if self.chat_gpt.stream:
+                reply = StreamingReply(interaction)
+                async for text in self.chat_gpt.gpt_text_stream(
+                    session_key, input, interaction.user.id
+                ):
+                    await reply.write(text)
+                await reply.finish()
+                return
+
+            response = await self.chat_gpt.gpt_text(
+                session_key, input, interaction.user.id
+            )
+        except InputTooLong as e:
+            await interaction.followup.send(
+                content=f"Your message is too long for the chatbot, it takes about {e.tokens} tokens and only {e.budget} fit."
+            )
+            return
+        # Send long responses as several messages, one at a time: a channel orders messages
+        # by when Discord receives them, so concurrent sends could arrive shuffled, and
+        # followups share one webhook rate limit so they wouldn't finish any sooner
+        for chunk in list(split_message(response)) or [EMPTY_REPLY]:
+            await interaction.followup.send(content=chunk)
 
     @app_commands.command(
         name="prompt",
@@ -66,7 +185,7 @@ class ChatBot(commands.Cog):
         bot_owner = interaction.client.application.owner.id
 
         if command_invoker == bot_owner:
-            self.chat_gpt.messages = setup_personality(input)
+            await self.chat_gpt.set_prompt(input)
             await interaction.followup.send(content="Prompt updated")
         else:
             await interaction.followup.send(
@@ -91,6 +210,9 @@ class ChatBot(commands.Cog):
         pp="[FLOAT] (-2.0 to 2.0) Increase or Decrease model's likelihood to talk about new topics",
         fp="[FLOAT] (-2.0 to 2.0) Increase or Decrease model's likelihood to repeat the same line verbatim",
         stop="[STRING] Up to 4 sequences where the API will stop generating further tokens",
+        scope="[STRING] Keep one conversation per channel or per user",
+        stream="[BOOLEAN] Show responses while they're being generated",
+        cache="[STRING] Reuse responses to repeated opening questions",
     )
     @app_commands.choices(
         model=[
@@ -100,7 +222,16 @@ class ChatBot(commands.Cog):
             Choice(name="gpt-4-32k-0314", value=4),
             Choice(name="gpt-3.5-turbo", value=5),
             Choice(name="gpt-3.5-turbo-0301", value=6),
-        ]
+        ],
+        scope=[
+            Choice(name="channel", value="channel"),
+            Choice(name="user", value="user"),
+        ],
+        cache=[
+            Choice(name="off", value="off"),
+            Choice(name="deterministic (temperature 0)", value="deterministic"),
+            Choice(name="all", value="all"),
+        ],
     )
     async def set_chatbot_parameters(
         self,
@@ -112,6 +243,9 @@ class ChatBot(commands.Cog):
         pp: Optional[float] = None,
         fp: Optional[float] = None,
         stop: Optional[str] = None,
+        scope: Optional[Choice[str]] = None,
+        stream: Optional[bool] = None,
+        cache: Optional[Choice[str]] = None,
     ):
         updated = False
         if conv_limit is not None:
@@ -135,6 +269,15 @@ class ChatBot(commands.Cog):
         if stop is not None:
             self.chat_gpt.stop = stop
             updated = True
+        if scope is not None:
+            self.chat_gpt.session_scope = scope.value
+            updated = True
+        if stream is not None:
+            self.chat_gpt.stream = stream
+            updated = True
+        if cache is not None:
+            self.chat_gpt.cache_mode = cache.value
+            updated = True
 
         if updated:
             await interaction.response.send_message(
@@ -158,9 +301,16 @@ class ChatBot(commands.Cog):
         pp = self.chat_gpt.presence_penalty
         fp = self.chat_gpt.frequency_penalty
         stop = self.chat_gpt.stop
+        scope = self.chat_gpt.session_scope
+        stream = self.chat_gpt.stream
+        sessions = self.chat_gpt.sessions.stats()
+        queue = self.chat_gpt.scheduler.stats()
+        cache = self.chat_gpt.cache.stats()
+        cache_mode = self.chat_gpt.cache_mode
+        flights = self.chat_gpt.singleflight.stats()
 
         await interaction.response.send_message(
-            content=f"Conversation limit: `{conv_limit}`\nModel: `{model}`\nTemperature: `{temperature}`\nMax tokens: `{max_tokens}`\nPresence penalty: `{pp}`\nFrequency penalty: `{fp}`\nStop: `{stop}`"
+            content=f"Conversation limit: `{conv_limit}`\nModel: `{model}`\nTemperature: `{temperature}`\nMax tokens: `{max_tokens}`\nPresence penalty: `{pp}`\nFrequency penalty: `{fp}`\nStop: `{stop}`\nScope: `{scope}`\nStream: `{stream}`\nSessions: `{sessions['sessions']}` (~`{sessions['tokens']}` tokens held, `{sessions['evicted']}` evicted)\nQueue: `{queue['waiting']}` waiting, `{queue['avg_wait']:.2f}s` average wait, `{queue['max_wait']:.2f}s` longest wait\nCache: `{cache_mode}`, `{cache['entries']}` entries, `{cache['hit_rate']:.1%}` hit rate ({cache['hits']} hits, {cache['misses']} misses), `{flights['coalesced']}` requests coalesced into `{flights['calls']}` calls"
         )
 
 
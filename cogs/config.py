@@ -1,7 +1,7 @@
 import os
 from typing import Union
 import discord
-from db_helper import SqlHelper as SQL
+from db_helper import AsyncSqlHelper as SQL, guild_cache
 from discord.ext import commands, tasks
 from discord import app_commands
 
@@ -59,9 +59,7 @@ class BotConfig(commands.Cog):
         guild : discord.Guild
             The guild that contains the channel to update
         """
-        db = SQL()
-        channel_id = db.get_guild_channel_id(guild.id)
-        db.close()
+        channel_id = guild_cache.get_guild_channel_id(guild.id)
 
         if channel_id != None:
             channel = discord.utils.get(guild.channels, id=channel_id)
@@ -109,9 +107,7 @@ class BotConfig(commands.Cog):
         channel : discord.TextChannel, discord.VoiceChannel
             The channel that will get edited to reflect the total member count
         """
-        db = SQL()
-        db.update_guild_channel_id(interaction.guild.id, channel.id)
-        db.close()
+        await SQL().update_guild_channel_id(interaction.guild.id, channel.id)
         await interaction.response.send_message(
             f"Updated the channel id successfully, Member Count Channel Id: {channel.id}."
         )
@@ -138,9 +134,7 @@ class BotConfig(commands.Cog):
         interaction : discord.Interaction
             The interaction caused by a user performing a slash command
         """
-        db = SQL()
-        channel_id = db.get_guild_channel_id(interaction.guild.id)
-        db.close()
+        channel_id = guild_cache.get_guild_channel_id(interaction.guild.id)
 
         # check if a channel has been set
         if channel_id != None:
@@ -178,14 +172,12 @@ class BotConfig(commands.Cog):
         prefix : str
             A guild's new prefix
         """
-        db = SQL()
-        if not db.set_prefix(interaction.guild_id, prefix):
+        if not await SQL().set_prefix(interaction.guild_id, prefix):
             await interaction.response.send_message(f"Unable to change prefix.")
         else:
             await interaction.response.send_message(
                 f"Prefix successfully changed to `{prefix}`"
             )
-        db.close()
 
     @prefix_group.command(name="view", description="View Prefix")
     @app_commands.checks.has_permissions(manage_guild=True)
@@ -200,15 +192,13 @@ class BotConfig(commands.Cog):
         interaction : discord.Interaction
             The interaction caused by a user performing a slash command
         """
-        db = SQL()
-        prefix = db.get_prefix(interaction.guild_id)
+        prefix = guild_cache.get_prefix(interaction.guild_id)
         if not prefix:
             await interaction.response.send_message(f"Unable to retrieve prefix.")
         else:
             await interaction.response.send_message(
                 f"Prefix currently set to `{prefix}`"
             )
-        db.close()
 
     @view_prefix.error
     @set_prefix.error
@@ -5,45 +5,59 @@ from discord.ui import Button, Select, View
 from discord import ButtonStyle
 from discord import app_commands
 from typing import List, Optional
-from dotenv import load_dotenv
+from help_catalog import HelpPage
 
-# determine if command is a subcommand and get its parent to include full command
-def option_details(command_info: app_commands.Command, option: str) -> str:
+
+async def send_help_page(
+    page: HelpPage,
+    interaction: discord.Interaction,
+    from_categ_view: Optional[bool] = None,
+    **select_kwargs,
+):
     """
-    Format and return details about a command's parameter.
+    Send a pre-rendered help page with the view that fits its number of items
+
+    ...
 
     Parameters
     ----------
-    command_info : app_commands.Command
-        The command that the parameter belongs to
-    option: str
-        The command's parameter that needs parsing
-
-    Returns
-    -------
-    str
-        The formatted details that belong to a command's parameter
+    page : HelpPage
+        The help of a command, group or category from the help catalog
+    interaction : discord.Interaction
+        The interaction caused by a user performing a slash command
+    from_categ_view : bool, optional, default=None
+        Whether or not the page replaces a view or UI item that was handling a category
+    **select_kwargs
+        What the select menu and buttons need to resolve a chosen item
     """
-    in_group = command_info.parent
-    param = command_info.get_parameter(option)
-    option_type = f"[{str(param.type).split('.')[1].upper()}]"
-    required = param.required
-    if not in_group:
-        command = param.command.name
+    # When only 1 option - green choose button
+    # when more than 1 option, select menu that is updated by buttons that sync with pages
+    if page.count == 0:
+        view = None
+    elif page.count == 1:
+        view = SingleButtonView(option_data=page.pages[0], **select_kwargs)
+    elif len(page.pages) == 1:
+        view = View()
+        view.add_item(SelectOption(option_data=page.pages[0], **select_kwargs))
     else:
-        command = f"{in_group.name} {command_info.name}"
-    description = ""
-    format_param_desc = param.description.split("]")[1].strip()
-    if param.name != format_param_desc:
-        description = format_param_desc
+        view = NavigationView(
+            option_data=page.pages, messages=page.messages, **select_kwargs
+        )
+        view.add_item(SelectOption(option_data=page.pages[0], **select_kwargs))
 
-    return f"**Option**: {option}\n**Description**: {description}\n**Type**: {option_type}\n**Command**: `{command}`\n**Required**: {required}"
+    if from_categ_view:
+        await interaction.response.edit_message(content=page.messages[0], view=view)
+    elif view is None:
+        await interaction.response.send_message(content=page.messages[0])
+    else:
+        await interaction.response.send_message(content=page.messages[0], view=view)
 
 
 async def group_view_helper(
     cmd_info: app_commands.Group,
     interaction: discord.Interaction,
     bot: commands.Bot,
+    from_categ_view: Optional[bool] = None,
 ):
     """
     A group view helper that helps with subcommand handling
@@ -58,61 +72,21 @@ async def group_view_helper(
         The interaction caused by a user performing a slash command
     bot : commands.Bot
         A custom Discord Bot
+    from_categ_view : bool, optional, default=None
+        Whether or not this helper is being called from a view or UI item that was handling a category
     """
     # subcommands instead of options
     # picking a subcommand here will load its options
     # just like category which also lists commands
-    desc = cmd_info.description
-    subcommands = cmd_info.commands  # list of subcommands, equiv of list of params
-
-    help_cmd_msg = f"**Command**: `{cmd_info.name}`\n**Description**: {desc}\n\n**Sub Commands**:\n"
-
-    count = 0
-    # option_txt = ""
-    page_content = []
-    for command in subcommands:
-        count += 1
-
-        if command.description != "":
-            page_content.append(f"{count} : {command.name} - {command.description}")
-        else:
-            page_content.append(f"{count} : {command.name}")
-    option_txt = [
-        "\n".join(page_content[i : i + 10]) for i in range(0, len(page_content), 10)
-    ]
-
-    pages = len(option_txt)
-    # When only 1 option - green choose button
-    # when more than 1 option, select menu that is updated by buttons that sync with pages - split up option_txt
-    if pages == 1 and count == 1:
-        view = SingleButtonView(
-            option_data=option_txt[0], is_group=True, group_info=cmd_info, bot=bot
-        )
-        help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-        await interaction.response.send_message(content=help_cmd_msg, view=view)
-    elif pages == 1 and count <= 10:
-        view = View()
-        view.add_item(
-            SelectOption(
-                option_data=option_txt[0], is_group=True, group_info=cmd_info, bot=bot
-            )
-        )
-        help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-        await interaction.response.send_message(content=help_cmd_msg, view=view)
-    else:
-        curr_page = 1
-        help_cmd_msg = (
-            f"{help_cmd_msg}```Page {curr_page}/{pages}\n{option_txt[curr_page-1]}```"
-        )
-        view = NavigationView(
-            option_data=option_txt, is_group=True, group_info=cmd_info, bot=bot
-        )
-        view.add_item(
-            SelectOption(
-                option_data=option_txt[0], is_group=True, group_info=cmd_info, bot=bot
-            )
-        )
-        await interaction.response.send_message(content=help_cmd_msg, view=view)
+    page = bot.help_catalog.page(cmd_info.qualified_name)
+    await send_help_page(
+        page,
+        interaction,
+        from_categ_view,
+        is_group=True,
+        group_info=cmd_info,
+        bot=bot,
+    )
 
 
 async def command_view_helper(
@@ -134,75 +108,8 @@ async def command_view_helper(
     from_categ_view : bool, optional, default=None
         Whether or not this helper is being called from a view or UI item that was handling a category
     """
-    desc = cmd_info.description
-    params = cmd_info.parameters
-
-    if len(params) > 0:
-        in_grp = cmd_info.parent
-        if not in_grp:
-            help_cmd_msg = f"**Command**: `{cmd_info.name}`\n**Description**: {desc}\n\n**Options**:\n"
-        else:
-            help_cmd_msg = f"**Command**: `{in_grp.name} {cmd_info.name}`\n**Description**: {desc}\n\n**Options**:\n"
-        # store and retrieve type/desc data in extras for a command instead?
-        # find description from param, format description to remove type, compare to param name, if same do nothing
-        count = 0
-        # option_txt = ""
-        page_content = []
-        for param in params:
-            count += 1
-            split_desc = param.description.split("]")
-            # print(f"{str(param.type).split('.')[1].upper()}")
-            # option_txt = f"{option_txt}{count} : {param.name}{split_desc[0]}] -{split_desc[1]}\n"
-            if param.name != split_desc[1].strip():
-                page_content.append(
-                    f"{count} : {param.name}{split_desc[0]}] -{split_desc[1]}"
-                )
-            else:
-                page_content.append(f"{count} : {param.name}{split_desc[0]}]")
-        option_txt = [
-            "\n".join(page_content[i : i + 10]) for i in range(0, len(page_content), 10)
-        ]
-
-        pages = len(option_txt)
-        # When only 1 option - green choose button
-        # when more than 1 option, select menu that is updated by buttons that sync with pages - split up option_txt
-        if pages == 1 and count == 1:
-            view = SingleButtonView(cmd_info=cmd_info, option_data=option_txt[0])
-            help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-            if from_categ_view:
-                await interaction.response.edit_message(content=help_cmd_msg, view=view)
-            else:
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-        elif pages == 1 and count <= 10:
-            view = View()
-            view.add_item(SelectOption(cmd_info=cmd_info, option_data=option_txt[0]))
-            help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-            if from_categ_view:
-                await interaction.response.edit_message(content=help_cmd_msg, view=view)
-            else:
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-        else:
-            curr_page = 1
-            help_cmd_msg = f"{help_cmd_msg}```Page {curr_page}/{pages}\n{option_txt[curr_page-1]}```"
-            view = NavigationView(cmd_info=cmd_info, option_data=option_txt)
-            view.add_item(SelectOption(cmd_info=cmd_info, option_data=option_txt[0]))
-            if from_categ_view:
-                await interaction.response.edit_message(content=help_cmd_msg, view=view)
-            else:
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-    else:
-        in_grp = cmd_info.parent
-        if not in_grp:
-            help_cmd_msg = f"**Command**: `{cmd_info.name}`\n**Description**: {desc}"
-        else:
-            help_cmd_msg = (
-                f"**Command**: `{in_grp.name} {cmd_info.name}`\n**Description**: {desc}"
-            )
-
-        if from_categ_view:
-            await interaction.response.edit_message(content=help_cmd_msg, view=None)
-        else:
-            await interaction.response.send_message(content=help_cmd_msg)
+    page = interaction.client.help_catalog.page(cmd_info.qualified_name)
+    await send_help_page(page, interaction, from_categ_view, cmd_info=cmd_info)
 
 
 class NavigationView(View):
@@ -215,12 +122,16 @@ class NavigationView(View):
     ----------
     cmd_info : app_commands.Command, optional
         A slash command
-    option_data : str, optional
-        A list of options to create pages to display from
-    category : str, optional
-        A category name
+    option_data : List[str], optional
+        The options listed on every page
+    messages : List[str], optional
+        The pre-rendered message of every page
     is_categ : bool, optional
         Whether or not the options are a list of commands belonging to a category
+    is_group : bool, optional
+        Whether or not the options are a list of subcommands belonging to a group
+    group_info : app_commands.Group, optional
+        A parent command
     bot : commands.Bot, optional
         The discord bot
 
@@ -242,28 +153,52 @@ class NavigationView(View):
         self,
         cmd_info: Optional[app_commands.Command] = None,
         option_data: Optional[List[str]] = None,
-        category: Optional[str] = None,
+        messages: Optional[List[str]] = None,
         is_categ: Optional[bool] = None,
+        is_group: Optional[bool] = None,
+        group_info: Optional[app_commands.Group] = None,
         bot: Optional[commands.Bot] = None,
     ):
         super().__init__()
         self.option_data = option_data
+        self.messages = messages
         self.cmd_info = cmd_info
-        self.category = category
         self.is_categ = is_categ
+        self.is_group = is_group
+        self.group_info = group_info
         self.bot = bot
 
-        if self.cmd_info != None:
-            desc = self.cmd_info.description
-            self.help_cmd_intro = f"**Command**: `{self.cmd_info.name}`\n**Description**: {desc}\n\n**Options**:\n"
-
-        if self.category != None:
-            self.help_cmd_intro = f"{self.category}\n"
-
         if self.option_data != None:
             self.pages = len(self.option_data)
             self.curr_page = 1
 
+    async def show_page(self, interaction: discord.Interaction):
+        """
+        Swap the select menu for the current page's and show the page's message
+
+        ...
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The interaction caused by a user pressing a navigation button
+        """
+        select = [x for x in self.children if x.custom_id == "select_options"][0]
+        self.remove_item(select)
+        self.add_item(
+            SelectOption(
+                cmd_info=self.cmd_info,
+                option_data=self.option_data[self.curr_page - 1],
+                is_categ=self.is_categ,
+                is_group=self.is_group,
+                group_info=self.group_info,
+                bot=self.bot,
+            )
+        )
+        await interaction.response.edit_message(
+            content=self.messages[self.curr_page - 1], view=self
+        )
+
     @discord.ui.button(emoji="⏮️", disabled=True, custom_id="start")
     async def btn_start_callback(
         self, interaction: discord.Interaction, button: Button
@@ -278,30 +213,14 @@ class NavigationView(View):
         button_end.disabled = False
 
         self.curr_page = 1
-
-        select = [x for x in self.children if x.custom_id == "select_options"][0]
-        self.remove_item(select)
-        if self.is_categ:
-            self.add_item(
-                SelectOption(
-                    option_data=self.option_data[self.curr_page - 1],
-                    is_categ=self.is_categ,
-                    bot=self.bot,
-                )
-            )
-        else:
-            self.add_item(
-                SelectOption(
-                    cmd_info=self.cmd_info,
-                    option_data=self.option_data[self.curr_page - 1],
-                )
-            )
-
-        help_cmd_msg = f"{self.help_cmd_intro}```Page {self.curr_page}/{self.pages}\n{self.option_data[self.curr_page-1]}```"
-        await interaction.response.edit_message(content=help_cmd_msg, view=self)
+        await self.show_page(interaction)
 
     @discord.ui.button(emoji="◀️", disabled=True, custom_id="back")
     async def btn_back_callback(self, interaction: discord.Interaction, button: Button):
+        button_forward = [x for x in self.children if x.custom_id == "forward"][0]
+        button_end = [x for x in self.children if x.custom_id == "end"][0]
+        button_forward.disabled = False
+        button_end.disabled = False
 
         self.curr_page -= 1
 
@@ -311,26 +230,7 @@ class NavigationView(View):
             button_start.disabled = True
             button_back.disabled = True
 
-        select = [x for x in self.children if x.custom_id == "select_options"][0]
-        self.remove_item(select)
-        if self.is_categ:
-            self.add_item(
-                SelectOption(
-                    option_data=self.option_data[self.curr_page - 1],
-                    is_categ=self.is_categ,
-                    bot=self.bot,
-                )
-            )
-        else:
-            self.add_item(
-                SelectOption(
-                    cmd_info=self.cmd_info,
-                    option_data=self.option_data[self.curr_page - 1],
-                )
-            )
-
-        help_cmd_msg = f"{self.help_cmd_intro}```Page {self.curr_page}/{self.pages}\n{self.option_data[self.curr_page-1]}```"
-        await interaction.response.edit_message(content=help_cmd_msg, view=self)
+        await self.show_page(interaction)
 
     @discord.ui.button(emoji="▶️", custom_id="forward")
     async def btn_forward_callback(
@@ -349,26 +249,7 @@ class NavigationView(View):
             button_forward.disabled = True
             button_end.disabled = True
 
-        select = [x for x in self.children if x.custom_id == "select_options"][0]
-        self.remove_item(select)
-        if self.is_categ:
-            self.add_item(
-                SelectOption(
-                    option_data=self.option_data[self.curr_page - 1],
-                    is_categ=self.is_categ,
-                    bot=self.bot,
-                )
-            )
-        else:
-            self.add_item(
-                SelectOption(
-                    cmd_info=self.cmd_info,
-                    option_data=self.option_data[self.curr_page - 1],
-                )
-            )
-
-        help_cmd_msg = f"{self.help_cmd_intro}```Page {self.curr_page}/{self.pages}\n{self.option_data[self.curr_page-1]}```"
-        await interaction.response.edit_message(content=help_cmd_msg, view=self)
+        await self.show_page(interaction)
 
     @discord.ui.button(emoji="⏭️", custom_id="end")
     async def btn_end_callback(self, interaction: discord.Interaction, button: Button):
@@ -382,27 +263,7 @@ class NavigationView(View):
         button_end.disabled = True
 
         self.curr_page = self.pages
-
-        select = [x for x in self.children if x.custom_id == "select_options"][0]
-        self.remove_item(select)
-        if self.is_categ:
-            self.add_item(
-                SelectOption(
-                    option_data=self.option_data[self.curr_page - 1],
-                    is_categ=self.is_categ,
-                    bot=self.bot,
-                )
-            )
-        else:
-            self.add_item(
-                SelectOption(
-                    cmd_info=self.cmd_info,
-                    option_data=self.option_data[self.curr_page - 1],
-                )
-            )
-
-        help_cmd_msg = f"{self.help_cmd_intro}```Page {self.curr_page}/{self.pages}\n{self.option_data[self.curr_page-1]}```"
-        await interaction.response.edit_message(content=help_cmd_msg, view=self)
+        await self.show_page(interaction)
 
     @discord.ui.button(style=ButtonStyle.danger, emoji="✖️", custom_id="danger")
     async def btn_stop_callback(self, interaction: discord.Interaction, button: Button):
@@ -410,6 +271,52 @@ class NavigationView(View):
         await interaction.response.edit_message(content=msg, view=None)
 
 
+async def show_chosen(
+    interaction: discord.Interaction,
+    choice: str,
+    cmd_info: Optional[app_commands.Command] = None,
+    is_categ: Optional[bool] = None,
+    is_group: Optional[bool] = None,
+    group_info: Optional[app_commands.Group] = None,
+):
+    """
+    Show the help of an option, command or subcommand picked from a help page
+
+    ...
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        The interaction caused by a user choosing an item
+    choice : str
+        The chosen line of the help page, "count : name [TYPE] - description"
+    cmd_info : app_commands.Command, optional
+        The command the options belong to
+    is_categ : bool, optional
+        Whether or not the choice is a command belonging to a category
+    is_group : bool, optional
+        Whether or not the choice is a subcommand belonging to a group
+    group_info : app_commands.Group, optional
+        The parent command of the subcommands
+    """
+    catalog = interaction.client.help_catalog
+    name = choice.split("-")[0].split(":")[1].split("[")[0].strip()
+    if cmd_info != None:
+        param_details = catalog.option(cmd_info.qualified_name, name)
+        await interaction.response.edit_message(content=param_details, view=None)
+    elif is_categ:
+        command = catalog.command(name)
+        if isinstance(command, app_commands.Group):
+            await group_view_helper(
+                command, interaction, interaction.client, from_categ_view=True
+            )
+        else:
+            await command_view_helper(command, interaction, from_categ_view=True)
+    elif is_group:
+        command = catalog.command(f"{group_info.qualified_name} {name}")
+        await command_view_helper(command, interaction, from_categ_view=True)
+
+
 class SingleButtonView(View):
     """
     A UI view containing a single button from the Discord Bot UI Kit.
@@ -424,6 +331,10 @@ class SingleButtonView(View):
         A single option to choose
     is_categ : bool, optional
         Whether or not the option is a command belonging to a category
+    is_group : bool, optional
+        Whether or not the option is a subcommand belonging to a group
+    group_info : app_commands.Group, optional
+        A parent command
     bot : commands.Bot, optional
         The discord bot
 
@@ -438,11 +349,15 @@ class SingleButtonView(View):
         cmd_info: Optional[app_commands.Command] = None,
         option_data: Optional[str] = None,
         is_categ: Optional[bool] = None,
+        is_group: Optional[bool] = None,
+        group_info: Optional[app_commands.Group] = None,
         bot: Optional[commands.Bot] = None,
     ):
         self.cmd_info = cmd_info
         self.option_data = option_data
         self.is_categ = is_categ
+        self.is_group = is_group
+        self.group_info = group_info
         self.bot = bot
         super().__init__()
 
@@ -450,17 +365,14 @@ class SingleButtonView(View):
     async def btn_choose_callback(
         self, interaction: discord.Interaction, button: Button
     ):
-        if self.cmd_info != None:
-            parse_option = (
-                self.option_data.split("-")[0].split(":")[1].split("[")[0].strip()
-            )
-            param_details = option_details(self.cmd_info, parse_option)
-            await interaction.response.edit_message(content=param_details, view=None)
-        elif self.is_categ:
-            # Because this is a category, option_data will be our single command
-            parse_command = self.option_data.split("-")[0].split(":")[1].strip()
-            command = self.bot.tree.get_command(parse_command)
-            await command_view_helper(command, interaction, from_categ_view=True)
+        await show_chosen(
+            interaction,
+            self.option_data,
+            self.cmd_info,
+            self.is_categ,
+            self.is_group,
+            self.group_info,
+        )
 
 
 class SelectOption(Select):
@@ -527,22 +439,14 @@ class SelectOption(Select):
         )
 
     async def callback(self, interaction):
-        if self.cmd_info != None:
-            parse_option = self.values[0].split(":")[1].split("[")[0].strip()
-            param_details = option_details(self.cmd_info, parse_option)
-            await interaction.response.edit_message(content=param_details, view=None)
-        elif self.is_categ:
-            parse_command = self.values[0].split(":")[1].strip()
-            command = self.bot.tree.get_command(parse_command)
-            cmd_type = type(command)
-            if cmd_type == app_commands.Command:
-                await command_view_helper(command, interaction, from_categ_view=True)
-            elif cmd_type == app_commands.Group:
-                await group_view_helper(command, interaction, self.bot)
-        elif self.is_group:
-            parse_command = self.values[0].split(":")[1].strip()
-            command = self.group_info.get_command(parse_command)
-            await command_view_helper(command, interaction, from_categ_view=True)
+        await show_chosen(
+            interaction,
+            self.values[0],
+            self.cmd_info,
+            self.is_categ,
+            self.is_group,
+            self.group_info,
+        )
 
 
 class General(commands.Cog):
@@ -601,55 +505,17 @@ class General(commands.Cog):
         input : str, optional
             A command, subcommand, option, or category that you want to view more details about
         """
-        # self.bot.help_dict.keys() for all categories
-        # self.bot.help_dict.values() for all commands
-        slash_commands = [
-            command.lower()
-            for sub_list in self.bot.help_dict.values()
-            for command in sub_list
-        ]
-
-        slash_categories = [category.lower() for category in self.bot.help_dict.keys()]
+        # Every lookup goes through the help catalog, rendered once per change of the tree
+        catalog = self.bot.help_catalog
         if input is None:
-            load_dotenv()
-            invite_url = os.getenv("INVITE_URL")
-            # help_dict is {'Default': ['hello', 'help']}
-            bot_name = interaction.client.application.name
-            avatar_url = interaction.client.application.icon.url
-            description = f"""Below you can see all the commands I know.
-            If you have any questions or comments about something ask on [Github](https://github.com/mtzim/discord-bot).\n
-            [Invite Me]({invite_url})\n
-            **Have a nice day!**"""
-            trailing_text = """\n\n`help commandName` - Command Details
-            `help commandName subCommandName` - Sub Command Details
-            `help commandName optionName` - Option Details
-            `help categoryName` - Category Details"""
-            embedMsg = discord.Embed(color=discord.Color.blue())
-            embedMsg.set_author(
-                name=f"Hello! I'm {bot_name}!", icon_url=f"{avatar_url}"
-            )
-            embedMsg.set_thumbnail(url=avatar_url)
-            embedMsg.description = description
-            # Sort dictionary category names alphabetically
-            sorted_help = dict(sorted(self.bot.help_dict.items()))
-            command_list = []
-            for key in sorted_help.keys():
-                for command in sorted_help[key]:
-                    command_list.append(f"`{command}`")
-                sorted_command_list = sorted(command_list)
-                value = ", ".join(sorted_command_list)
-                embedMsg.add_field(name=key.upper(), value=value, inline=False)
-                command_list.clear()
-            # \u2800 is an invisible unicode character, can also maybe use \u200b
-            embedMsg.add_field(name="\u2800", value=f"{trailing_text}", inline=False)
+            embedMsg = catalog.overview(interaction.client.application)
             await interaction.response.send_message(embed=embedMsg)
             return None  # exit
 
-        # TODO: split only the first word and hanndle the rest of the input seperately if it exists
-        input_params = input.split(" ")
+        input_params = input.split()
         input_length = len(input_params)
-        is_cmd = input_params[0].lower() in slash_commands
-        is_categ = input_params[0].lower() in slash_categories
+        is_cmd = input_length > 0 and catalog.is_command(input_params[0])
+        is_categ = input_length > 0 and catalog.is_category(input_params[0])
 
         if not is_cmd and not is_categ:
             await interaction.response.send_message(
@@ -668,89 +534,31 @@ class General(commands.Cog):
         if input_length > 1 and is_cmd:
             input_cmd = input_params[0]
             input_add = input_params[1]
-            param = None
-
-            cmd_info = self.bot.tree.get_command(input_cmd)
-            if type(input_add) == app_commands.Parameter:
-                param = cmd_info.get_parameter(input_add)  # returns None if not found
-            elif type(input_add) == app_commands.Group:
-                pass
 
-            if param != None:
-                option_help = option_details(cmd_info, param.name)
+            option_help = catalog.option(input_cmd, input_add)
+            sub_cmd = catalog.command(f"{input_cmd} {input_add}")
+            if option_help is not None:
                 await interaction.response.send_message(content=option_help)
             # if subcommand
-            else:
-                sub_cmd = cmd_info.get_command(input_add)
+            elif isinstance(sub_cmd, app_commands.Command):
                 await command_view_helper(sub_cmd, interaction)
+            else:
+                await interaction.response.send_message(
+                    content="Failed to find relevant help for input"
+                )
 
         # /help command
         elif is_cmd:
-            cmd_info = self.bot.tree.get_command(input)
-            cmd_type = type(cmd_info)
-            if cmd_type == app_commands.Command:
-                await command_view_helper(cmd_info, interaction)
-            elif cmd_type == app_commands.Group:
+            cmd_info = catalog.command(input_params[0])
+            if isinstance(cmd_info, app_commands.Group):
                 await group_view_helper(cmd_info, interaction, self.bot)
+            else:
+                await command_view_helper(cmd_info, interaction)
         # /help category
         elif is_categ:
-            command_list = []
-            for key in self.bot.help_dict.keys():
-                if key.lower() == input_params[0].lower():
-                    command_list = sorted(self.bot.help_dict[key])
-                    break
-            help_cmd_msg = f"{input_params[0].capitalize()}\n"
-
-            count = 0
-            page_content = []
-            for command in command_list:
-                count += 1
-                cmd_info = self.bot.tree.get_command(command)
-                cmd_desc = cmd_info.description
-
-                # description exists
-                if len(cmd_desc) > 0:
-                    page_content.append(f"{count} : {cmd_info.name} - {cmd_desc}")
-                else:
-                    page_content.append(f"{count} : {cmd_info.name}")
-            option_txt = [
-                "\n".join(page_content[i : i + 10])
-                for i in range(0, len(page_content), 10)
-            ]
-
-            pages = len(option_txt)
-
-            # modify to work with category, encapsulate cmd logic, selectoption.values[0] pass ass cmd
-            # view won't know cmd_info so pass reference to bot instead, update cmd_helper func
-            if pages == 1 and count == 1:
-                view = SingleButtonView(
-                    option_data=option_txt[0], is_categ=is_categ, bot=self.bot
-                )
-                help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-            elif pages == 1 and count <= 10:
-                view = View()
-                view.add_item(
-                    SelectOption(
-                        option_data=option_txt[0], is_categ=is_categ, bot=self.bot
-                    )
-                )
-                help_cmd_msg = f"{help_cmd_msg}```{option_txt[0]}```"
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-            else:
-                curr_page = 1
-                help_cmd_msg = f"{help_cmd_msg}```Page {curr_page}/{pages}\n{option_txt[curr_page-1]}```"
-                view = NavigationView(
-                    option_data=option_txt, is_categ=is_categ, bot=self.bot
-                )
-                view.add_item(
-                    SelectOption(
-                        option_data=option_txt[0], is_categ=is_categ, bot=self.bot
-                    )
-                )
-                await interaction.response.send_message(content=help_cmd_msg, view=view)
-            # reuse nav view and is_cmd code
-            # selecting a command will lead to nav view with the command selected
+            # view won't know cmd_info so pass reference to bot instead
+            page = catalog.category(input_params[0])
+            await send_help_page(page, interaction, is_categ=is_categ, bot=self.bot)
 
     @app_commands.command(
         description=f"Check if the bot is online",
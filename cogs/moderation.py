@@ -1,9 +1,24 @@
 import os
+import time
+from datetime import datetime, timezone
 from typing import Dict, Optional
 import discord
 from discord import app_commands
 from discord.ext import commands
-import re
+from prune_core.deleter import PruneDeleter
+from prune_core.message_index import MessageIndex, entry_matcher, time_to_id
+from prune_core.pipeline import (
+    DryRunSink,
+    after_message,
+    cached_messages,
+    indexed_history,
+    last_messages,
+    run_prune,
+    time_range,
+)
+from prune_core.predicate import PrunePredicate
+from prune_core.reactions import ReactionClearer
+from prune_core.scan_cache import ScanCache
 
 
 class Moderation(commands.Cog):
@@ -16,12 +31,16 @@ class Moderation(commands.Cog):
     ----------
     bot : commands.Bot
         The discord bot
+    scan_cache : ScanCache
+        Recent dry runs that a real prune with the same options can reuse
+    message_index : MessageIndex, optional
+        Metadata of recent messages, enabled by PRUNE_INDEX_SIZE
 
     Methods
     -------
-    prune(interaction,amount,attachments,bots,embeds,filter,invites,pinned,reactions,silent,system,until,user)
+    prune(interaction,after,amount,attachments,before,bots,dry_run,embeds,filter,invites,pinned,reactions,silent,system,until,user)
         Message Pruning
-    prune_helper(interaction,amount,attachments,bots,embeds,filter,invites,pinned,reactions,silent,system,until,user)
+    prune_helper(interaction,after,amount,attachments,before,bots,dry_run,embeds,filter,invites,pinned,reactions,silent,system,until,user)
         A helper that handles message pruning logic based on the parameters that were supplied
     """
 
@@ -31,19 +50,54 @@ class Moderation(commands.Cog):
 
     def __init__(self, bot) -> None:
         self.bot = bot
+        self.scan_cache = ScanCache()
+
+        # Optional index of recent messages so prunes don't have to walk history
+        index_size = int(os.getenv("PRUNE_INDEX_SIZE") or 0)
+        self.message_index = MessageIndex(index_size) if index_size > 0 else None
 
     @commands.Cog.listener()
     async def on_ready(self):
+        # A new gateway session may have missed events, only trust what comes next
+        if self.message_index is not None:
+            self.message_index.clear()
         print(f"* Cog: {self.MODULE_NAME['module']} loaded.")
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if self.message_index is not None and message.guild is not None:
+            self.message_index.add(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if self.message_index is not None:
+            self.message_index.update(
+                payload.channel_id, payload.message_id, payload.data
+            )
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if self.message_index is not None:
+            self.message_index.remove(payload.channel_id, [payload.message_id])
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
+        if self.message_index is not None:
+            self.message_index.remove(payload.channel_id, payload.message_ids)
+
     @app_commands.command(
         description=f"Message Pruning",
         extras=MODULE_NAME,
     )
     @app_commands.describe(
+        after="[STRING] Prunes messages sent after the given time, e.g. 2023-04-01 18:30 (UTC)",
         amount="[INTEGER] Prunes messages by the specified amount",
         attachments="[BOOLEAN] Only prunes messages containing attachments",
+        before="[STRING] Prunes messages sent before the given time, e.g. 2023-04-01 18:30 (UTC)",
         bots="[BOOLEAN] Prunes all messages created by any bot",
+        dry_run="[BOOLEAN] Only counts the messages that would be pruned without touching them",
         embeds="[BOOLEAN] Only prunes messages containing embeds",
         filter="[STRING] Only prunes messages that contain the specified string",
         invites="[BOOLEAN] Only prunes messages containing Discord invites",
@@ -63,9 +117,12 @@ class Moderation(commands.Cog):
     async def prune(
         self,
         interaction: discord.Interaction,
+        after: Optional[str] = None,
         amount: Optional[int] = None,
         attachments: Optional[bool] = False,
+        before: Optional[str] = None,
         bots: Optional[bool] = False,
+        dry_run: Optional[bool] = False,
         embeds: Optional[bool] = False,
         filter: Optional[str] = None,
         invites: Optional[bool] = False,
@@ -85,12 +142,18 @@ class Moderation(commands.Cog):
         ----------
         interaction : discord.Interaction
             The interaction caused by a user performing a slash command
+        after: str, optional, default=None
+            Prunes messages sent after the given time (ISO 8601, UTC unless an offset is given)
         amount: int, optional, default=None
             Prunes messages by the specified amount
         attachments: bool, optional, default=False
             Only prunes messages containing attachments
+        before: str, optional, default=None
+            Prunes messages sent before the given time (ISO 8601, UTC unless an offset is given)
         bots: bool, optional, default=False
             Prunes all messages created by any bot
+        dry_run: bool, optional, default=False
+            Only counts the messages that would be pruned without touching them
         embeds: bool, optional, default=False
             Only prunes messages containing embeds
         filter: str, optional, default=None
@@ -111,16 +174,19 @@ class Moderation(commands.Cog):
             Prunes all messages by the specified user
         """
         # Mandatory option is missing
-        if not until and not amount:
+        if not until and not amount and not after and not before:
             await interaction.response.send_message(
-                f"One of the option out of `amount or until` is mandatory to process this command. To see the usage and definitions of these options, you can run the command `help prune`."
+                f"One of the option out of `amount, until, after or before` is mandatory to process this command. To see the usage and definitions of these options, you can run the command `help prune`."
             )
             return
         await self.prune_helper(
             interaction,
+            after,
             amount,
             attachments,
+            before,
             bots,
+            dry_run,
             embeds,
             filter,
             invites,
@@ -136,9 +202,12 @@ class Moderation(commands.Cog):
     async def prune_helper(
         self,
         interaction: discord.Interaction,
+        after: str,
         amount: int,
         attachments: bool,
+        before: str,
         bots: bool,
+        dry_run: bool,
         embeds: bool,
         filter: str,
         invites: bool,
@@ -152,18 +221,27 @@ class Moderation(commands.Cog):
         """
         A helper that handles message pruning logic based on the parameters that were supplied
 
+        Every combination of options runs the same pipeline: a source of messages, the
+        compiled predicate and a sink that deletes, clears reactions or only counts.
+
         ...
 
         Parameters
         ----------
         interaction : discord.Interaction
             The interaction caused by a user performing a slash command
+        after: str, optional, default=None
+            Prunes messages sent after the given time (ISO 8601, UTC unless an offset is given)
         amount: int, optional, default=None
             Prunes messages by the specified amount
         attachments: bool, optional, default=False
             Only prunes messages containing attachments
+        before: str, optional, default=None
+            Prunes messages sent before the given time (ISO 8601, UTC unless an offset is given)
         bots: bool, optional, default=False
             Prunes all messages created by any bot
+        dry_run: bool, optional, default=False
+            Only counts the messages that would be pruned without touching them
         embeds: bool, optional, default=False
             Only prunes messages containing embeds
         filter: str, optional, default=None
@@ -183,32 +261,13 @@ class Moderation(commands.Cog):
         user: discord.User, optional, default=None
             Prunes all messages by the specified user
         """
-        # find the substr in the str
-        def contains_str(filter: str, content: str) -> bool:
-            # if filter found in content, return True
-            # matching whole worlds, content.find(filter) != -1 for any occurance
-            if filter in content.split():
-                return True
-            return False
-
-        # find the substr pattern in the str
-        def contains_invites(content: str) -> bool:
-            # if invite link found, return True
-            invite_filter = re.compile(
-                r"(https:\/\/)?(www\.)?(discord\.gg|discord\.me|discordapp\.com\/invite|discord\.com\/invite)\/([a-z0-9-.]+)?",
-                re.I,
-            )
-            if invite_filter.search(content):
-                return True
-            return False
-
-        # count how many messages deleted per user
-        def count_msgs(name, cnt) -> Dict:
-            if name not in cnt:
-                cnt[name] = 1
-                return cnt
-            cnt[name] += 1
-            return cnt
+
+        # parse a user supplied time, times without an offset are UTC
+        def parse_time(value: str) -> datetime:
+            parsed = datetime.fromisoformat(value.strip())
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed
 
         # format message count into printable string
         def del_by_user(total_by_user: Dict) -> str:
@@ -218,172 +277,202 @@ class Moderation(commands.Cog):
             to_print = "\n".join(fmt)
             return to_print
 
-        # Core logic for prune command
-        async def purge_check(msg: discord.Message):
-            # Delete only system messages, ignore AEPIR(treat AEPIR as False)
-            if system == True and msg.is_system() == True and msg.pinned == False:
-                # only delete system messages, ignore pinned, can be combined with user/bot/filter
-                return True
-            # Delete if flag and conditions met
-            elif (
-                bots or user or filter or attachments or embeds or invites or reactions
-            ):
-                if bots and msg.author.bot and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if user and user == msg.author.mention and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if filter and contains_str(filter, msg.content) and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if attachments and (len(msg.attachments) > 0) and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if embeds and (len(msg.embeds) > 0) and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if invites and contains_invites(msg.content) and not reactions:
-                    if msg.pinned == True and pinned == False:
-                        return False
-                    return True
-                if reactions:
-                    await msg.clear_reactions()
-                return False
-            # Regular message or no flags set
-            elif msg.pinned == True and pinned == False:
-                return False
-            else:
-                return True
+        # A dry run is only useful with its results
+        if dry_run:
+            silent = False
 
-        # Get the set of messages to delete from --until or amount, excluding pinned by default: until ID error(Message doesn't exist in this channel)
-        if amount:
-            if not silent:
-                await interaction.response.send_message(
-                    f"Fetching {amount} messages, it may take awhile"
-                )
-                skip_first_msg = True
-                msgs_to_del = []
-                msgs_per_author = {}
-                async for message in interaction.channel.history(limit=amount + 1):
-                    if skip_first_msg:
-                        # exclude prune results from deletion and include command msg for deletion
-                        skip_first_msg = False
-                        continue
-                    if await purge_check(message):
-                        msgs_to_del.append(message)
-                        msgs_per_author = count_msgs(message.author, msgs_per_author)
-            else:
-                # Adjust limit for unprinted prune results
-                msgs_to_del = []
-                async for message in interaction.channel.history(limit=amount):
-                    if await purge_check(message):
-                        msgs_to_del.append(message)
+        # A blank filter would turn into no filter at all and target every message
+        if filter is not None and not filter.strip():
+            await interaction.response.send_message(
+                "The filter option needs at least one word."
+            )
+            return
 
-            if not silent:
-                await interaction.edit_original_response(
-                    content=f"Deleting {len(msgs_to_del)} messages, it may take awhile"
-                )
-            await interaction.channel.delete_messages(msgs_to_del)
+        # Compile the options once, every fetched message goes through the same check
+        predicate = PrunePredicate(
+            attachments=attachments,
+            bots=bots,
+            embeds=embeds,
+            filter=filter,
+            invites=invites,
+            pinned=pinned or reactions,
+            system=system,
+            user_id=user.id if user else None,
+        )
 
-            # Disable printing of prune results
-            # Print out prune results after finished, disabled by -s
-            if not silent:
-                embed_stats = discord.Embed()
-                embed_stats.set_author(name=f"Prune results")
-                embed_stats.add_field(
-                    name=f"Total messages deleted",
-                    value=f"```apache\n{len(msgs_to_del)}```",
-                    inline=False,
-                )
-                embed_stats.add_field(
-                    name=f"Deleted messages by user",
-                    value=f"```apache\n{del_by_user(msgs_per_author)}```",
-                    inline=False,
-                )
-                embed_stats.set_footer(
-                    text=f"Autodelete is enabled. This message will be deleted after 10 seconds."
-                )
-                msg_to_del = await interaction.edit_original_response(
-                    content=f"Done! Showing prune results below.", embed=embed_stats
-                )
-                await msg_to_del.delete(delay=10)
-        else:
+        # Validate the options that point at messages before answering
+        try:
+            after_time = parse_time(after) if after else None
+            before_time = parse_time(before) if before else None
+        except ValueError:
+            await interaction.response.send_message(
+                f"The after and before options take a time such as `2023-04-01 18:30` (UTC) or `2023-04-01T18:30+09:00`."
+            )
+            return
+
+        # A real prune right after a dry run with the same options reuses its scan
+        scan_key = (
+            interaction.channel.id,
+            amount,
+            until,
+            after_time,
+            before_time,
+            predicate.key,
+        )
+        scan = None if dry_run else self.scan_cache.pop(scan_key)
+
+        until_msg = None
+        if until and scan is None:
             try:
-                msg = await interaction.channel.fetch_message(until)
+                until_msg = await interaction.channel.fetch_message(until)
             except discord.NotFound:
                 await interaction.response.send_message(
                     f"The message id that was used in the until option could not be found in this channel."
                 )
                 return
 
-            msgs_per_author = {}
-            if not silent:
-                await interaction.response.send_message(
-                    f"Fetching messages, it may take awhile"
-                )
-                skip_first_msg = True
-                msgs_to_del = []
-
-                async for message in interaction.channel.history(
-                    limit=None, after=msg, oldest_first=False
-                ):
-                    if skip_first_msg:
-                        # exclude prune results from deletion and include command msg for deletion
-                        # don't use check logic for the msgs added for deletion
-                        skip_first_msg = False
-                        continue
-
-                    if await purge_check(message):
-                        msgs_to_del.append(message)
-                        msgs_per_author = count_msgs(message.author, msgs_per_author)
+        # The prune results message is never pruned itself
+        exclude = []
+        if not silent:
+            if scan is not None:
+                content = f"Reusing the dry run from {time.monotonic() - scan.created:.0f}s ago, it may take awhile"
+            elif amount:
+                content = f"Fetching {amount} messages, it may take awhile"
             else:
-                # Not printing prune results
-                msgs_to_del = []
-                async for message in interaction.channel.history(
-                    limit=None, after=msg, oldest_first=False
-                ):
-                    if await purge_check(message):
-                        msgs_to_del.append(message)
-
-            # Include fetched msg for deletion if criteria met
-            if await purge_check(msg):
-                msgs_to_del.append(msg)
-                msgs_per_author = count_msgs(msg.author, msgs_per_author)
-
-            if not silent:
+                content = f"Fetching messages, it may take awhile"
+            await interaction.response.send_message(content)
+            exclude.append((await interaction.original_response()).id)
+
+        # Pick the messages to check from a dry run, the message index, --until, a time range or amount
+        matches_entry = None
+        if self.message_index is not None and not dry_run:
+            # Dry runs read history so every match can be explained per rule
+            matches_entry = entry_matcher(predicate)
+        prematched = scan is not None or matches_entry is not None
+        if scan is not None:
+            source = cached_messages(interaction.channel, scan.ids)
+        elif matches_entry is not None:
+            after_id = None
+            if until_msg is not None:
+                after_id = until_msg.id - 1
+            elif after_time:
+                after_id = time_to_id(after_time) - 1
+            # Only look at messages older than the prune results
+            before_ids = exclude + ([time_to_id(before_time)] if before_time else [])
+            source = indexed_history(
+                interaction.channel,
+                self.message_index,
+                matches_entry,
+                predicate.matches,
+                lambda author_id: self.bot.get_user(author_id) or author_id,
+                limit=None if until_msg is not None else amount,
+                after_id=after_id,
+                before_id=min(before_ids, default=None),
+            )
+        elif until_msg is not None:
+            source = after_message(interaction.channel, until_msg)
+        elif after_time or before_time:
+            # Adjust limit for printed prune results, they're only in range without before
+            limit = amount + len(exclude) if amount and not before_time else amount
+            source = time_range(interaction.channel, after_time, before_time, limit)
+        else:
+            source = last_messages(interaction.channel, amount + len(exclude))
+
+        # Targeted messages are counted, lose their reactions or are deleted
+        if dry_run:
+            sink = DryRunSink(predicate.explain)
+            action = "Matched"
+        elif reactions:
+
+            async def show_progress(stats: Dict):
                 await interaction.edit_original_response(
-                    content=f"Deleting {len(msgs_to_del)} messages, it may take awhile"
+                    content=f"Clearing reactions, {stats['cleared'] + stats['skipped']} of {stats['queued']} messages done ({stats['per_second']:.1f} messages/s)"
                 )
-            await interaction.channel.delete_messages(msgs_to_del)
 
-            # Disable printing of prune results
-            # Print out prune results after finished, disabled by -s
-            if not silent:
-                embed_stats = discord.Embed()
-                embed_stats.set_author(name=f"Prune results")
+            sink = ReactionClearer(on_progress=None if silent else show_progress)
+            action = "Cleared"
+        else:
+            sink = PruneDeleter(interaction.channel.delete_messages)
+            action = "Deleted"
+
+        async def show_fetched(count: int):
+            if not silent and not dry_run:
+                await interaction.edit_original_response(
+                    content=f"{'Clearing reactions from' if reactions else 'Deleting'} {count} messages, it may take awhile"
+                )
+
+        # Matches are handled while history is still being fetched, scans and index lookups already matched
+        msgs_per_author = await run_prune(
+            source,
+            predicate.matches if not prematched else lambda msg: True,
+            sink,
+            exclude=exclude,
+            on_fetched=show_fetched,
+            count_authors=scan is None,
+        )
+        if scan is not None:
+            msgs_per_author = scan.per_author
+        if dry_run:
+            self.scan_cache.put(scan_key, sink.ids, msgs_per_author)
+
+        # Disable printing of prune results
+        # Print out prune results after finished, disabled by -s
+        if not silent:
+            stats = sink.stats()
+            if dry_run:
+                total = stats["matched"]
+            elif reactions:
+                total = stats["cleared"] + stats["skipped"]
+            else:
+                total = stats["deleted"]
+            embed_stats = discord.Embed()
+            embed_stats.set_author(
+                name=(
+                    f"Dry run results, nothing was pruned"
+                    if dry_run
+                    else f"Prune results"
+                )
+            )
+            embed_stats.add_field(
+                name=f"Total messages {action.lower()}",
+                value=f"```apache\n{total}```",
+                inline=False,
+            )
+            if stats.get("failed"):
                 embed_stats.add_field(
-                    name=f"Total messages deleted",
-                    value=f"```apache\n{len(msgs_to_del)}```",
+                    name=f"Messages that could not be {action.lower()}",
+                    value=f"```apache\n{stats['failed']}```",
                     inline=False,
                 )
+            if reactions and not dry_run:
                 embed_stats.add_field(
-                    name=f"Deleted messages by user",
-                    value=f"```apache\n{del_by_user(msgs_per_author)}```",
+                    name=f"Throughput",
+                    value=f"```apache\n{stats['per_second']:.1f} messages/s in {stats['elapsed']:.1f}s```",
                     inline=False,
                 )
-                embed_stats.set_footer(
-                    text=f"Autodelete is enabled. This message will be deleted after 10 seconds."
+            if dry_run:
+                embed_stats.add_field(
+                    name=f"Matched messages by rule",
+                    value=f"```apache\n{del_by_user(stats['per_rule']) or 'none'}```",
+                    inline=False,
                 )
-                msg_to_del = await interaction.edit_original_response(
-                    content=f"Done! Showing prune results below.", embed=embed_stats
+            embed_stats.add_field(
+                name=f"{action} messages by user",
+                value=f"```apache\n{del_by_user(msgs_per_author)}```",
+                inline=False,
+            )
+            embed_stats.set_footer(
+                text=(
+                    f"Run the same prune without dry_run within {self.scan_cache.ttl:.0f} seconds to prune exactly these messages. "
+                    if dry_run
+                    else ""
                 )
-                await msg_to_del.delete(delay=10)
+                + f"Autodelete is enabled. This message will be deleted after 10 seconds."
+            )
+            msg_to_del = await interaction.edit_original_response(
+                content=f"Done! Showing prune results below.", embed=embed_stats
+            )
+            await msg_to_del.delete(delay=10)
 
     @prune.error
     async def prune_err(self, interaction: discord.Interaction, error):
@@ -1,11 +1,365 @@
 import os
-from typing import List
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple, Union
 from dotenv import load_dotenv
 import mysql.connector as database
+from mysql.connector.constants import ClientFlag
 
 # Load data from .env file
 load_dotenv()
 
+# Matches the column default assigned during database table creation
+DEFAULT_PREFIX = "?"
+
+# A child of the logger main.py writes to discord.log
+logger = logging.getLogger("discord.db_helper")
+
+
+class GuildCache:
+    """
+    An in-memory cache of guild settings that sits in front of the database.
+
+    ...
+
+    Attributes
+    ----------
+    guilds : Dict
+        Guild settings keyed by guild id
+    loaded : bool
+        Whether or not the cache has been filled from the database
+    hits : int
+        Number of lookups that were answered by the cache
+    misses : int
+        Number of lookups for guilds that aren't in the cache
+
+    Methods
+    -------
+    load(db)
+        Fill the cache with every guild stored in the database
+    get_prefix(guild_id)
+        Retrieve a guild's prefix from the cache
+    get_guild_channel_id(guild_id)
+        Retrieve a guild's channel id from the cache
+    add_guild(guild_name,guild_id)
+        Adds a guild to the cache
+    remove_guild(guild_id)
+        Removes a guild from the cache
+    set_prefix(guild_id,new_prefix)
+        Set a guild's prefix in the cache
+    set_guild_channel_id(guild_id,channel_id)
+        Set a guild's member count channel id in the cache
+    set_guild_name(guild_name,guild_id)
+        Set a guild's name in the cache
+    stats()
+        Lookup statistics for the cache
+    """
+
+    def __init__(self):
+        self.guilds = {}
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, db: "SqlHelper"):
+        """
+        Fill the cache with every guild stored in the database
+
+        ...
+
+        Parameters
+        ----------
+        db : SqlHelper
+            An open database helper to read the guilds table with
+        """
+        rows = db.query(
+            "SELECT guild_id, guild_name, prefix, member_count_channel_id FROM guilds"
+        )
+        self.guilds = {
+            guild_id: {
+                "guild_name": guild_name,
+                "prefix": prefix,
+                "member_count_channel_id": channel_id,
+            }
+            for guild_id, guild_name, prefix, channel_id in rows
+        }
+        self.loaded = True
+
+    def _lookup(self, guild_id) -> Union[Dict, None]:
+        settings = self.guilds.get(guild_id)
+        if settings is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return settings
+
+    def get_prefix(self, guild_id) -> Union[str, None]:
+        """
+        Retrieve a guild's prefix from the cache
+
+        ...
+
+        Parameters
+        ----------
+        guild_id : int
+            A guild's id
+
+        Returns
+        -------
+        str, None
+            The guild's prefix if the guild is cached
+        """
+        settings = self._lookup(guild_id)
+        return settings["prefix"] if settings else None
+
+    def get_guild_channel_id(self, guild_id) -> Union[int, None]:
+        """
+        Retrieve a guild's channel id from the cache
+
+        ...
+
+        Parameters
+        ----------
+        guild_id : int
+            A guild's id
+
+        Returns
+        -------
+        int, None
+            The guild's member count channel id if one is set and the guild is cached
+        """
+        settings = self._lookup(guild_id)
+        return settings["member_count_channel_id"] if settings else None
+
+    def add_guild(self, guild_name, guild_id):
+        # Like the database upsert, a known guild keeps its settings but takes the new name
+        guild = self.guilds.setdefault(
+            guild_id, {"prefix": DEFAULT_PREFIX, "member_count_channel_id": None}
+        )
+        guild["guild_name"] = guild_name
+
+    def remove_guild(self, guild_id):
+        self.guilds.pop(guild_id, None)
+
+    def set_prefix(self, guild_id, new_prefix):
+        if guild_id in self.guilds:
+            self.guilds[guild_id]["prefix"] = new_prefix
+
+    def set_guild_channel_id(self, guild_id, channel_id):
+        if guild_id in self.guilds:
+            self.guilds[guild_id]["member_count_channel_id"] = channel_id
+
+    def set_guild_name(self, guild_name, guild_id):
+        if guild_id in self.guilds:
+            self.guilds[guild_id]["guild_name"] = guild_name
+
+    def stats(self) -> Dict:
+        """
+        Lookup statistics for the cache
+
+        ...
+
+        Returns
+        -------
+        Dict
+            The number of cached guilds, hits, misses and the hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "guilds": len(self.guilds),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Process-wide cache, SqlHelper keeps it in sync whenever it writes guild settings
+guild_cache = GuildCache()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of reusable MySQL connections.
+
+    ...
+
+    Attributes
+    ----------
+    size : int
+        The maximum number of connections the pool will open
+    recycle : float
+        Seconds a connection may sit idle before it gets replaced on checkout
+    timeout : float
+        Seconds to wait for a free connection before giving up
+    connect_args : Dict
+        Keyword arguments passed to mysql.connector.connect
+    recycled : int
+        Number of idle connections that were replaced on checkout
+
+    Methods
+    -------
+    get_connection()
+        Borrow a healthy connection from the pool
+    release(con)
+        Give a borrowed connection back to the pool
+    stats()
+        Usage statistics for the pool
+    """
+
+    def __init__(self, size: int, recycle: float, timeout: float, **connect_args):
+        self.size = size
+        self.recycle = recycle
+        self.timeout = timeout
+        self.connect_args = connect_args
+        self.recycled = 0
+
+        # Idle connections are stored as (connection, time released) pairs
+        self._idle = deque()
+        self._created = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        return database.connect(**self.connect_args)
+
+    def get_connection(self):
+        """
+        Borrow a healthy connection from the pool, opening a new one if the pool isn't full yet
+
+        ...
+
+        Returns
+        -------
+        MySQLConnection
+            A connection that is checked out until it gets released
+
+        Raises
+        ------
+        mysql.connector.errors.PoolError
+            No connection became available within the timeout
+        """
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                if not self._cond.wait(self.timeout):
+                    raise database.errors.PoolError(
+                        f"No database connection available after {self.timeout} seconds"
+                    )
+            if self._idle:
+                con, released_at = self._idle.pop()
+            else:
+                con, released_at = None, None
+                self._created += 1
+            self._in_use += 1
+
+        try:
+            if con is None:
+                con = self._connect()
+            elif time.monotonic() - released_at > self.recycle:
+                # The server may have dropped a connection that sat idle this long
+                self._discard(con)
+                con = self._connect()
+                self.recycled += 1
+            elif not con.is_connected():
+                con.reconnect(attempts=1)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return con
+
+    def release(self, con):
+        """
+        Give a borrowed connection back to the pool
+
+        ...
+
+        Parameters
+        ----------
+        con : MySQLConnection
+            A connection that was returned by get_connection
+        """
+        healthy = True
+        try:
+            # Never hand out a connection with someone else's uncommitted changes
+            if con.in_transaction:
+                con.rollback()
+        except database.Error:
+            healthy = False
+            self._discard(con)
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((con, time.monotonic()))
+            else:
+                self._created -= 1
+            self._cond.notify()
+
+    def _discard(self, con):
+        try:
+            con.close()
+        except database.Error:
+            pass
+
+    def stats(self) -> Dict:
+        """
+        Usage statistics for the pool
+
+        ...
+
+        Returns
+        -------
+        Dict
+            The pool size and how many connections are open, in use, idle and recycled
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "recycled": self.recycled,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Retrieve the process-wide connection pool, creating it on first use
+
+    ...
+
+    Returns
+    -------
+    ConnectionPool
+        The pool that every SqlHelper borrows its connection from
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                size=int(os.getenv("DB_POOL_SIZE", 5)),
+                recycle=float(os.getenv("DB_POOL_RECYCLE", 3600)),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+                user=os.getenv("DB_USERNAME"),
+                password=os.getenv("DB_PASSWORD"),
+                host=os.getenv("DB_HOST"),
+                database=os.getenv("DB_NAME"),
+                # Make UPDATE report matched rows instead of changed rows, otherwise
+                # setting a value to what it already was would look like a missing guild
+                client_flags=[ClientFlag.FOUND_ROWS],
+            )
+        return _pool
+
 
 class SqlHelper:
     """
@@ -15,16 +369,10 @@ class SqlHelper:
 
     Attributes
     ----------
-    username : str
-        A MySQL Database username
-    password : str
-        A MySQL Database password belonging to the username
-    host : str
-        The host IP of the MySQL Database
-    db_name : str
-        The Database name
+    pool : ConnectionPool
+        The pool the connection is borrowed from
     db_con : MySQLConnection
-        Connection object to the MySQL Database
+        Connection object to the MySQL Database, borrowed from the pool
     db_cur : CursorBase
         Cursor to use for manipulating database information
 
@@ -34,10 +382,12 @@ class SqlHelper:
         Managed connection attribute
     cursor()
         Managed cursor attribute
+    rowcount()
+        Number of rows matched by the last statement
     commit()
         Commits changes to the database
     close(commit=True)
-        Commits changes to the database before closing the connection
+        Commits changes to the database before giving the connection back to the pool
     execute(sql,params=None)
         Execute sql commands
     fetchall()
@@ -58,6 +408,10 @@ class SqlHelper:
         Adds a guild to the database
     check_guilds_remove(guild_list)
         Check if the database is synced with a guild_list and remove guilds that aren't on the guild_list
+    reconcile_guilds(guild_list)
+        Sync the database with a guild_list in a single transaction
+    apply_guild_changes(upserts,renames,deletes)
+        Apply a batch of guild changes in a single transaction
     delete_guild(guild_id)
         Remove a guild from the database
     update_guild_channel_id(guild_id,channel_id)
@@ -67,17 +421,15 @@ class SqlHelper:
     """
 
     def __init__(self):
-        self.username = os.getenv("DB_USERNAME")
-        self.password = os.getenv("DB_PASSWORD")
-        self.host = os.getenv("DB_HOST")
-        self.db_name = os.getenv("DB_NAME")
-        self.db_con = database.connect(
-            user=self.username,
-            password=self.password,
-            host=self.host,
-            database=self.db_name,
-        )
-        self.db_cur = self.db_con.cursor()
+        self.pool = get_pool()
+        self.db_con = self.pool.get_connection()
+        try:
+            self.db_cur = self.db_con.cursor()
+        except Exception:
+            # Nothing will ever close this helper, give the connection back now
+            self.pool.release(self.db_con)
+            self.db_con = None
+            raise
 
     def __enter__(self):
         return self
@@ -93,13 +445,23 @@ class SqlHelper:
     def cursor(self):
         return self.db_cur
 
+    @property
+    def rowcount(self):
+        return self.db_cur.rowcount
+
     def commit(self):
         self.db_con.commit()
 
     def close(self, commit=True):
-        if commit:
-            self.commit()
-        self.connection.close()
+        if self.db_con is None:
+            return
+        try:
+            if commit:
+                self.commit()
+            self.db_cur.close()
+        finally:
+            self.pool.release(self.db_con)
+            self.db_con = None
 
     def execute(self, sql, params=None):
         self.cursor.execute(sql, params or ())
@@ -130,11 +492,10 @@ class SqlHelper:
         int, None
             The guild's id if it was found in the database
         """
-        if self.guild_exists(guild_id):
-            sql = "SELECT member_count_channel_id FROM guilds WHERE guild_id=%s"
-            self.execute(sql, (guild_id,))
-            return self.fetchone()[0]
-        return None
+        sql = "SELECT member_count_channel_id FROM guilds WHERE guild_id=%s"
+        self.execute(sql, (guild_id,))
+        row = self.fetchone()
+        return row[0] if row else None
 
     def get_prefix(self, guild_id):
         """
@@ -152,11 +513,10 @@ class SqlHelper:
         str
             The guild's prefix if it was found in the database
         """
-        if self.guild_exists(guild_id):
-            sql = "SELECT prefix FROM guilds WHERE guild_id=%s"
-            self.execute(sql, (guild_id,))
-            return self.fetchone()[0]
-        return None
+        sql = "SELECT prefix FROM guilds WHERE guild_id=%s"
+        self.execute(sql, (guild_id,))
+        row = self.fetchone()
+        return row[0] if row else None
 
     def set_prefix(self, guild_id, new_prefix) -> bool:
         """
@@ -176,24 +536,24 @@ class SqlHelper:
         bool
             Whether or not updating the prefix was successful or not
         """
-        if self.guild_exists(guild_id):
-            sql = "UPDATE guilds SET prefix=%s WHERE guild_id=%s"
-            self.execute(
-                sql,
-                (
-                    new_prefix,
-                    guild_id,
-                ),
-            )
-            self.commit()
-            return True
-        return False
+        sql = "UPDATE guilds SET prefix=%s WHERE guild_id=%s"
+        self.execute(
+            sql,
+            (
+                new_prefix,
+                guild_id,
+            ),
+        )
+        if self.rowcount == 0:
+            return False
+        self.commit()
+        guild_cache.set_prefix(guild_id, new_prefix)
+        return True
 
     def guild_exists(self, guild_id):
-        sql = "SELECT guild_id FROM guilds WHERE guild_id=%s"
-        if len(self.query(sql, (guild_id,))) > 0:
-            return True
-        return False
+        sql = "SELECT 1 FROM guilds WHERE guild_id=%s"
+        self.execute(sql, (guild_id,))
+        return self.fetchone() is not None
 
     def add_guild(self, guild_name, guild_id):
         """
@@ -213,16 +573,19 @@ class SqlHelper:
         bool
             Whether or not adding the guild to the database was successful or not
         """
-        if self.guild_exists(guild_id):
-            return False
+        # Unlike ON DUPLICATE KEY UPDATE, INSERT IGNORE reports 0 rows for an existing guild
+        # even with FOUND_ROWS enabled, so rowcount tells the two cases apart
         self.execute(
-            "INSERT INTO guilds (guild_name, guild_id) VALUES (%s,%s)",
+            "INSERT IGNORE INTO guilds (guild_name, guild_id) VALUES (%s,%s)",
             (
                 guild_name,
                 guild_id,
             ),
         )
+        if self.rowcount == 0:
+            return False
         self.commit()
+        guild_cache.add_guild(guild_name, guild_id)
         return True
 
     # Clean up orphaned guild entries in the database that occur when someone removes the bot from a guild while it's offline
@@ -236,19 +599,131 @@ class SqlHelper:
         ----------
         guild_list : List
             A list of guilds that a discord bot is a member of
+
+        Returns
+        -------
+        int
+            The number of guilds that were removed from the database
         """
         self.execute("SELECT guild_id FROM guilds")
-        guilds_in_db = self.fetchall()
-
-        # Using a set to avoid O(n) lookup for deletion continually in for loop
-        guild_ids = [guilds[0] for guilds in guilds_in_db]
-        guilds_dict = set(guild_ids)
+        guilds_in_db = {row[0] for row in self.fetchall()}
 
         # Delete any guilds in the database that the bot isn't apart of
-        for guild in guild_list:
-            guilds_dict.remove(guild.id)
-        for guild_rmv in guilds_dict:
-            self.execute("DELETE FROM guilds WHERE guild_id=%s", (guild_rmv,))
+        guilds_rmv = guilds_in_db - {guild.id for guild in guild_list}
+        if guilds_rmv:
+            self.cursor.executemany(
+                "DELETE FROM guilds WHERE guild_id=%s",
+                [(guild_id,) for guild_id in guilds_rmv],
+            )
+            self.commit()
+            for guild_id in guilds_rmv:
+                guild_cache.remove_guild(guild_id)
+        return len(guilds_rmv)
+
+    def reconcile_guilds(self, guild_list: List) -> Dict:
+        """
+        Sync the database with a guild_list in a single transaction, adding new guilds,
+        removing guilds that aren't on the guild_list and updating changed guild names
+
+        ...
+
+        Parameters
+        ----------
+        guild_list : List
+            A list of guilds that a discord bot is a member of
+
+        Returns
+        -------
+        Dict
+            The number of guilds added, removed and renamed and how long it took in seconds
+        """
+        start = time.perf_counter()
+
+        self.execute("SELECT guild_id, guild_name FROM guilds")
+        guilds_in_db = dict(self.fetchall())
+        guilds_in = {guild.id: guild.name for guild in guild_list}
+
+        to_add = [
+            (guilds_in[guild_id], guild_id)
+            for guild_id in guilds_in.keys() - guilds_in_db.keys()
+        ]
+        to_remove = [(guild_id,) for guild_id in guilds_in_db.keys() - guilds_in.keys()]
+        to_rename = [
+            (guild_name, guild_id)
+            for guild_id, guild_name in guilds_in.items()
+            if guild_id in guilds_in_db and guilds_in_db[guild_id] != guild_name
+        ]
+
+        try:
+            if to_add:
+                self.cursor.executemany(
+                    "INSERT IGNORE INTO guilds (guild_name, guild_id) VALUES (%s,%s)",
+                    to_add,
+                )
+            if to_remove:
+                self.cursor.executemany(
+                    "DELETE FROM guilds WHERE guild_id=%s", to_remove
+                )
+            if to_rename:
+                self.cursor.executemany(
+                    "UPDATE guilds SET guild_name=%s WHERE guild_id=%s", to_rename
+                )
+            self.commit()
+        except database.Error:
+            self.connection.rollback()
+            raise
+
+        for guild_name, guild_id in to_add:
+            guild_cache.add_guild(guild_name, guild_id)
+        for (guild_id,) in to_remove:
+            guild_cache.remove_guild(guild_id)
+        for guild_name, guild_id in to_rename:
+            guild_cache.set_guild_name(guild_name, guild_id)
+
+        return {
+            "added": len(to_add),
+            "removed": len(to_remove),
+            "renamed": len(to_rename),
+            "seconds": time.perf_counter() - start,
+        }
+
+    def apply_guild_changes(
+        self, upserts: List, renames: List, deletes: List
+    ) -> None:
+        """
+        Apply a batch of guild changes in a single transaction without touching the guild cache
+
+        ...
+
+        Parameters
+        ----------
+        upserts : List
+            (guild_name, guild_id) pairs to add, or rename if they already exist
+        renames : List
+            (guild_name, guild_id) pairs of guilds to rename
+        deletes : List
+            Ids of guilds to remove, removed before the upserts so a guild that left and
+            joined again is added back with default settings
+        """
+        try:
+            if deletes:
+                self.cursor.executemany(
+                    "DELETE FROM guilds WHERE guild_id=%s",
+                    [(guild_id,) for guild_id in deletes],
+                )
+            if upserts:
+                self.cursor.executemany(
+                    "INSERT INTO guilds (guild_name, guild_id) VALUES (%s,%s) ON DUPLICATE KEY UPDATE guild_name=VALUES(guild_name)",
+                    upserts,
+                )
+            if renames:
+                self.cursor.executemany(
+                    "UPDATE guilds SET guild_name=%s WHERE guild_id=%s", renames
+                )
+            self.commit()
+        except database.Error:
+            self.connection.rollback()
+            raise
 
     def delete_guild(self, guild_id):
         """
@@ -266,11 +741,12 @@ class SqlHelper:
         bool
             Whether or not removing the guild from the database was successful or not
         """
-        if self.guild_exists(guild_id):
-            self.execute("DELETE FROM guilds WHERE guild_id=%s", (guild_id,))
-            self.commit()
-            return True
-        return False
+        self.execute("DELETE FROM guilds WHERE guild_id=%s", (guild_id,))
+        if self.rowcount == 0:
+            return False
+        self.commit()
+        guild_cache.remove_guild(guild_id)
+        return True
 
     def update_guild_channel_id(self, guild_id, channel_id):
         """
@@ -290,18 +766,19 @@ class SqlHelper:
         bool
             Whether or not updating the guild's channel id in the database was successful or not
         """
-        if self.guild_exists(guild_id):
-            sql = "UPDATE guilds SET member_count_channel_id=%s WHERE guild_id=%s"
-            self.execute(
-                sql,
-                (
-                    channel_id,
-                    guild_id,
-                ),
-            )
-            self.commit()
-            return True
-        return False
+        sql = "UPDATE guilds SET member_count_channel_id=%s WHERE guild_id=%s"
+        self.execute(
+            sql,
+            (
+                channel_id,
+                guild_id,
+            ),
+        )
+        if self.rowcount == 0:
+            return False
+        self.commit()
+        guild_cache.set_guild_channel_id(guild_id, channel_id)
+        return True
 
     def update_guild_name(self, guild_name, guild_id):
         """
@@ -321,14 +798,307 @@ class SqlHelper:
         bool
             Whether or not updating the guild's name in the database was successful or not
         """
-        if self.guild_exists(guild_id):
-            self.execute(
-                "UPDATE guilds SET guild_name=%s WHERE guild_id=%s",
-                (
-                    guild_name,
-                    guild_id,
-                ),
+        self.execute(
+            "UPDATE guilds SET guild_name=%s WHERE guild_id=%s",
+            (
+                guild_name,
+                guild_id,
+            ),
+        )
+        if self.rowcount == 0:
+            return False
+        self.commit()
+        guild_cache.set_guild_name(guild_name, guild_id)
+        return True
+
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Retrieve the thread pool that AsyncSqlHelper runs database work on, creating it on first use
+
+    ...
+
+    Returns
+    -------
+    ThreadPoolExecutor
+        An executor with one worker per pooled connection
+    """
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("DB_POOL_SIZE", 5)),
+                thread_name_prefix="db",
             )
-            self.commit()
-            return True
-        return False
+        return _executor
+
+
+class AsyncSqlHelper:
+    """
+    An async helper class for SQL database interaction that never blocks the event loop.
+
+    Every call borrows a pooled connection on a bounded worker thread, runs the
+    matching SqlHelper method there and gives the connection back before returning.
+    Use this from coroutines; the synchronous SqlHelper is only meant for code that
+    already runs off the event loop (worker threads, scripts, or callables passed to run).
+
+    ...
+
+    Methods
+    -------
+    run(func,*args)
+        Run func(db,*args) with an open SqlHelper on a worker thread
+    get_guild_channel_id(guild_id)
+        Retrieve a guild's channel id from the database
+    get_prefix(guild_id)
+        Retrieve a guild's prefix from the database
+    set_prefix(guild_id,new_prefix)
+        Set a guild's prefix in the database with the new prefix
+    guild_exists(guild_id)
+        Check if a guild exists within the database
+    add_guild(guild_name,guild_id)
+        Adds a guild to the database
+    check_guilds_remove(guild_list)
+        Check if the database is synced with a guild_list and remove guilds that aren't on the guild_list
+    reconcile_guilds(guild_list)
+        Sync the database with a guild_list in a single transaction
+    delete_guild(guild_id)
+        Remove a guild from the database
+    update_guild_channel_id(guild_id,channel_id)
+        Update a guild's channel id that controls member count in the database
+    update_guild_name(guild_name,guild_id)
+        Update a guild's name in the database
+    """
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run func(db,*args) with an open SqlHelper on a worker thread
+
+        ...
+
+        Parameters
+        ----------
+        func : Callable
+            A function that takes a SqlHelper as its first argument
+        args : Any
+            Additional arguments to pass to func
+
+        Returns
+        -------
+        Any
+            Whatever func returned
+        """
+
+        def work():
+            with SqlHelper() as db:
+                return func(db, *args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), work)
+
+    async def get_guild_channel_id(self, guild_id) -> Union[int, None]:
+        return await self.run(SqlHelper.get_guild_channel_id, guild_id)
+
+    async def get_prefix(self, guild_id) -> Union[str, None]:
+        return await self.run(SqlHelper.get_prefix, guild_id)
+
+    async def set_prefix(self, guild_id, new_prefix) -> bool:
+        return await self.run(SqlHelper.set_prefix, guild_id, new_prefix)
+
+    async def guild_exists(self, guild_id) -> bool:
+        return await self.run(SqlHelper.guild_exists, guild_id)
+
+    async def add_guild(self, guild_name, guild_id) -> bool:
+        return await self.run(SqlHelper.add_guild, guild_name, guild_id)
+
+    async def check_guilds_remove(self, guild_list: List) -> int:
+        return await self.run(SqlHelper.check_guilds_remove, guild_list)
+
+    async def reconcile_guilds(self, guild_list: List) -> Dict:
+        return await self.run(SqlHelper.reconcile_guilds, guild_list)
+
+    async def delete_guild(self, guild_id) -> bool:
+        return await self.run(SqlHelper.delete_guild, guild_id)
+
+    async def update_guild_channel_id(self, guild_id, channel_id) -> bool:
+        return await self.run(SqlHelper.update_guild_channel_id, guild_id, channel_id)
+
+    async def update_guild_name(self, guild_name, guild_id) -> bool:
+        return await self.run(SqlHelper.update_guild_name, guild_name, guild_id)
+
+
+class GuildWriteQueue:
+    """
+    A write-behind queue for guild join, leave and rename events.
+
+    Events are coalesced per guild id (the last write wins, except a guild that left
+    and joined again is deleted before it's added back) and written to the
+    database in batches, either every interval seconds or as soon as max_pending
+    guilds are waiting. The guild cache is updated immediately so lookups never
+    see stale data while a write is pending.
+
+    ...
+
+    Attributes
+    ----------
+    interval : float
+        Seconds between periodic flushes
+    max_pending : int
+        Number of pending guilds that triggers an early flush
+    flushed : int
+        Number of guild writes that made it to the database
+    coalesced : int
+        Number of events that were merged into an already pending write
+
+    Methods
+    -------
+    start()
+        Start the background flush task
+    add_guild(guild_name,guild_id)
+        Queue adding a guild to the database
+    delete_guild(guild_id)
+        Queue removing a guild from the database
+    update_guild_name(guild_name,guild_id)
+        Queue updating a guild's name in the database
+    flush()
+        Write every pending change to the database
+    close()
+        Stop the background flush task and drain the queue
+    stats()
+        Statistics for the queue
+    """
+
+    def __init__(self, interval: float = 2.0, max_pending: int = 100):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.flushed = 0
+        self.coalesced = 0
+
+        # guild_id -> ("add" | "rename" | "delete" | "readd", guild_name)
+        self._pending = {}
+        self._task = None
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    def start(self):
+        """
+        Start the background flush task
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    @staticmethod
+    def _merge(older: Tuple, newer: Tuple) -> Tuple:
+        # A guild that left and joined again must lose its old settings, it's deleted then added
+        if newer[0] == "add" and older[0] in ("delete", "readd"):
+            return ("readd", newer[1])
+        # A rename only changes the name that a pending add will write
+        if newer[0] == "rename" and older[0] in ("add", "readd"):
+            return (older[0], newer[1])
+        # A guild that is being removed has no name left to change
+        if newer[0] == "rename" and older[0] == "delete":
+            return older
+        return newer
+
+    def _queue(self, guild_id, op: str, guild_name=None):
+        pending = self._pending.get(guild_id)
+        if pending is not None:
+            self.coalesced += 1
+            self._pending[guild_id] = self._merge(pending, (op, guild_name))
+        else:
+            self._pending[guild_id] = (op, guild_name)
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def add_guild(self, guild_name, guild_id):
+        guild_cache.add_guild(guild_name, guild_id)
+        self._queue(guild_id, "add", guild_name)
+
+    def delete_guild(self, guild_id):
+        guild_cache.remove_guild(guild_id)
+        self._queue(guild_id, "delete")
+
+    def update_guild_name(self, guild_name, guild_id):
+        guild_cache.set_guild_name(guild_name, guild_id)
+        self._queue(guild_id, "rename", guild_name)
+
+    async def flush(self):
+        """
+        Write every pending change to the database, failed batches are requeued and merged with events that arrived meanwhile
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+
+            upserts, renames, deletes = [], [], []
+            for guild_id, (op, guild_name) in batch.items():
+                if op == "add":
+                    upserts.append((guild_name, guild_id))
+                elif op == "readd":
+                    deletes.append(guild_id)
+                    upserts.append((guild_name, guild_id))
+                elif op == "rename":
+                    renames.append((guild_name, guild_id))
+                else:
+                    deletes.append(guild_id)
+
+            try:
+                await AsyncSqlHelper().run(
+                    SqlHelper.apply_guild_changes, upserts, renames, deletes
+                )
+            except Exception:
+                # Events that arrived during the write happened after the failed ones
+                for guild_id, failed in batch.items():
+                    newer = self._pending.get(guild_id)
+                    if newer is None:
+                        self._pending[guild_id] = failed
+                    else:
+                        self._pending[guild_id] = self._merge(failed, newer)
+                raise
+            self.flushed += len(batch)
+
+    async def _flush_loop(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write guild changes to the database")
+
+    async def close(self):
+        """
+        Stop the background flush task and drain the queue
+        """
+        # Let an in-flight flush finish instead of cancelling it halfway through a write
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict:
+        """
+        Statistics for the queue
+
+        ...
+
+        Returns
+        -------
+        Dict
+            The number of pending, flushed and coalesced guild writes
+        """
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "coalesced": self.coalesced,
+        }
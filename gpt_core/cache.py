@@ -0,0 +1,209 @@
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class CompletionCache:
+    """
+    An LRU and TTL cache of chatbot responses with an optional SQLite backing store
+
+    ...
+
+    Attributes
+    ----------
+    max_entries : int
+        Maximum number of responses kept in memory
+    ttl : float
+        Seconds a cached response stays valid
+    path : str, optional
+        SQLite file that keeps responses across restarts
+    prune_every : int
+        Number of writes to the backing store between removals of expired responses
+    hits : int
+        Number of lookups answered by the cache
+    misses : int
+        Number of lookups that weren't cached
+
+    Methods
+    -------
+    make_key(prompt, context, params)
+        Build the cache key for a prompt
+    get(key)
+        Retrieve a cached response
+    set(key, response)
+        Store a response
+    clear()
+        Remove every cached response
+    stats()
+        Hit rate statistics for the cache
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 86400,
+        path: Optional[str] = None,
+        prune_every: int = 100,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.prune_every = prune_every
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (response, time stored), ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._db = None
+        self._db_lock = threading.Lock()
+        # Starts full so the first write also removes what expired while the bot was down
+        self._writes_since_prune = prune_every
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS completions_created ON completions(created)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(prompt: str, context: List, params: Dict) -> str:
+        """
+        Build the cache key for a prompt
+
+        ...
+
+        Parameters
+        ----------
+        prompt : str
+            The user's input, case and whitespace are normalized
+        context : List
+            The messages sent before the prompt, usually just the system prompt
+        params : Dict
+            Model parameters that change the response
+
+        Returns
+        -------
+        str
+            A sha256 hex digest
+        """
+        normalized = " ".join(prompt.casefold().split())
+        context_hash = hashlib.sha256(
+            json.dumps(context, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        payload = json.dumps(
+            {"prompt": normalized, "context": context_hash, "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _db_get(self, key: str):
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT response, created FROM completions WHERE key=?", (key,)
+            ).fetchone()
+
+    def _db_set(self, key: str, response: str, created: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, response, created) VALUES (?,?,?)",
+                (key, response, created),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_every:
+                self._writes_since_prune = 0
+                self._db.execute(
+                    "DELETE FROM completions WHERE created<?", (time.time() - self.ttl,)
+                )
+            self._db.commit()
+
+    def _remember(self, key: str, response: str, created: float):
+        self._entries[key] = (response, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Retrieve a cached response, falling back to the backing store on a memory miss
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A key from make_key
+
+        Returns
+        -------
+        str, None
+            The cached response if there is one that hasn't expired
+        """
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            entry = await asyncio.to_thread(self._db_get, key)
+            if entry is not None:
+                self._remember(key, *entry)
+
+        if entry is None or time.time() - entry[1] > self.ttl:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, response: str):
+        """
+        Store a response
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A key from make_key
+        response : str
+            The chatbot's response
+        """
+        created = time.time()
+        self._remember(key, response, created)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, response, created)
+
+    def clear(self):
+        """
+        Remove every cached response
+        """
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM completions")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """
+        Hit rate statistics for the cache
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Entries held in memory, hits, misses and the hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
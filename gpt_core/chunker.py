@@ -0,0 +1,124 @@
+import re
+from typing import Iterator, Optional, Tuple
+
+FENCE = "```"
+FENCE_PATTERN = re.compile(r"```([^\s`]*)")
+
+# Boundaries to split on, from most to least preferred
+SENTENCE_ENDS = (". ", "! ", "? ")
+
+
+def _scan_fences(body: str, fence: Optional[str]) -> Optional[str]:
+    # Every fence toggles between inside and outside of a code block
+    for match in FENCE_PATTERN.finditer(body):
+        fence = None if fence else match.group(0)
+    return fence
+
+
+def _find_break(text: str, lo: int, hi: int) -> Tuple[int, int]:
+    # Prefer boundaries in the second half of the window so chunks don't get tiny
+    mid = lo + (hi - lo) // 2
+
+    cut = text.rfind("\n\n", mid, hi)
+    if cut != -1:
+        return cut, cut + 2
+
+    cut = max(text.rfind(end, mid, hi) for end in SENTENCE_ENDS)
+    if cut != -1:
+        return cut + 1, cut + 2
+
+    for sep, start in (("\n", mid), (" ", mid), ("\n", lo + 1), (" ", lo + 1)):
+        cut = text.rfind(sep, start, hi)
+        if cut != -1:
+            return cut, cut + 1
+
+    # No boundary at all, split mid word but never through a run of backticks
+    cut = hi
+    while cut > lo + 1 and text[cut - 1] == "`" and text[cut] == "`":
+        cut -= 1
+    if text[cut - 1] == "`" and text[cut] == "`":
+        cut = hi
+    return cut, cut
+
+
+def next_chunk(
+    text: str, start: int = 0, fence: Optional[str] = None, limit: int = 2000
+) -> Tuple[str, int, Optional[str]]:
+    """
+    Cut the next message sized chunk out of text, reopening and closing code blocks
+    so every chunk renders on its own
+
+    ...
+
+    Parameters
+    ----------
+    text : str
+        The full text being split
+    start : int, optional, default=0
+        Position the chunk starts at
+    fence : str, optional, default=None
+        The code fence (e.g. ```py) left open by the previous chunk
+    limit : int, optional, default=2000
+        Maximum number of characters per chunk
+
+    Returns
+    -------
+    Tuple[str, int, Optional[str]]
+        The chunk, the position the next chunk starts at and the code fence left open
+    """
+    # Drop an unusually long language tag rather than let it eat the chunk
+    if fence and len(fence) > limit // 4:
+        fence = FENCE
+    prefix = f"{fence}\n" if fence else ""
+    closing = f"\n{FENCE}"
+    end = len(text)
+
+    # The rest of the text fits as long as any code block it leaves open can still be closed
+    fits = False
+    if len(prefix) + end - start <= limit:
+        open_fence = _scan_fences(text[start:], fence)
+        fits = len(prefix) + end - start + (len(closing) if open_fence else 0) <= limit
+
+    if fits:
+        cut, resume = end, end
+    else:
+        room = max(1, limit - len(prefix) - len(closing))
+        cut, resume = _find_break(text, start, start + room)
+
+    body = text[start:cut]
+    fence_after = _scan_fences(body, fence)
+    chunk = prefix + body.rstrip()
+    if fence_after:
+        chunk += closing
+    else:
+        # Outside of code blocks whitespace between chunks carries no meaning
+        while resume < end and text[resume] in " \n":
+            resume += 1
+    return chunk, resume, fence_after
+
+
+def split_message(text: str, limit: int = 2000) -> Iterator[str]:
+    """
+    Split text into chunks of at most limit characters in a single pass, preferring
+    paragraph, sentence and then word boundaries and keeping code blocks balanced
+
+    ...
+
+    Parameters
+    ----------
+    text : str
+        The text to split
+    limit : int, optional, default=2000
+        Maximum number of characters per chunk, Discord's message limit by default
+
+    Yields
+    ------
+    str
+        The next non-empty chunk
+    """
+    position = 0
+    fence = None
+    while position < len(text):
+        chunk, position, fence = next_chunk(text, position, fence, limit)
+        if chunk.strip():
+            yield chunk
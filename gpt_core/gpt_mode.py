@@ -1,7 +1,13 @@
 import os
+import asyncio
+from contextlib import nullcontext
 import openai
 from . import gpt_utils
-from .ratelimit import completions_with_backoff
+from .cache import CompletionCache
+from .history_store import HistoryStore
+from .ratelimit import RequestScheduler, completions_with_backoff
+from .sessions import InputTooLong, SessionStore
+from .singleflight import FlightAbandoned, SingleFlight
 from dotenv import load_dotenv
 
 
@@ -11,10 +17,16 @@ class ChatGPT:
 
     Methods
     -------
-    ask_openai()
-        Sends user input to the openai api and returns the response
-    gpt_text(user_input)
-        Interacts with the user, taking their input and displaying the bot's response
+    session_key(channel_id, user_id)
+        Builds the key of the conversation a message belongs to
+    async set_prompt(prompt)
+        Changes the personality of the chatbot and resets every conversation
+    ask_openai(messages, stream=False)
+        Sends the conversation to the openai api and returns the completion
+    async gpt_text(session_key, user_input, user_id=None)
+        Interacts with the user, taking their input and returning the bot's response
+    async gpt_text_stream(session_key, user_input, user_id=None)
+        Interacts with the user, taking their input and yielding the bot's response as it's generated
     """
 
     def __init__(self) -> None:
@@ -22,10 +34,20 @@ class ChatGPT:
         load_dotenv()
         openai.api_key = os.getenv("OPENAI_API_KEY")
 
-        # Setup Personality
-        self.messages = gpt_utils.setup_personality()
+        # Setup Personality, every conversation starts from it
+        self.prompt = None
+        self.sessions = SessionStore(
+            lambda: gpt_utils.setup_personality(self.prompt),
+            lambda message: gpt_utils.count_tokens(message, self.model),
+        )
+
+        # Shared client side rate limiter for every request to openai
+        self.scheduler = RequestScheduler()
 
-        # Limit context length
+        # Keep one conversation per "channel" or per "user"
+        self.session_scope = "channel"
+
+        # Limit context length in messages, the model's token budget is always enforced too
         self.conversation_limit = 20
 
         # Configure GPT model parameters
@@ -36,30 +58,209 @@ class ChatGPT:
         self.frequency_penalty = 0  # defaults to 0 (-2.0 to 2.0)
         self.stop = None  # defaults to None
 
-    def ask_openai(self):
-        completion = completions_with_backoff(
+        # Yield responses token by token instead of waiting for the full completion
+        self.stream = True
+
+        # Cache the first response of a conversation: "off", "deterministic" (temperature 0) or "all"
+        self.cache_mode = "deterministic"
+        self.cache = CompletionCache(path=os.getenv("GPT_CACHE_PATH") or None)
+
+        # Conversations are written through to disk and loaded again on first use after a restart
+        history_path = os.getenv("GPT_HISTORY_PATH")
+        self.history = HistoryStore(history_path) if history_path else None
+
+        # Identical cacheable requests that are already in flight share one upstream call
+        self.singleflight = SingleFlight()
+
+    def session_key(self, channel_id: int, user_id: int) -> str:
+        if self.session_scope == "user":
+            return f"user:{user_id}"
+        return f"channel:{channel_id}"
+
+    async def set_prompt(self, prompt: str):
+        self.prompt = prompt
+        self.sessions.clear()
+        if self.history is not None:
+            await asyncio.to_thread(self.history.clear)
+
+    async def ask_openai(self, messages, stream=False):
+        completion = await completions_with_backoff(
             model=self.model,
-            messages=self.messages,
+            messages=messages,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             presence_penalty=self.presence_penalty,
             frequency_penalty=self.frequency_penalty,
             stop=self.stop,
+            stream=stream,
+        )
+        return completion
+
+    async def _hydrate(self, session):
+        # Sessions start from the personality, a persisted conversation continues where it left off
+        if session.hydrated:
+            return
+        session.hydrated = True
+        if self.history is None:
+            return
+        messages = await asyncio.to_thread(
+            self.history.load, session.key, self.conversation_limit
         )
-        self.messages.append(completion["choices"][0]["message"])
-        return completion["choices"][0]["message"]["content"]
+        for message in messages:
+            session.append(message)
+            if message["role"] == "assistant":
+                session.exchanges += 1
+        budget = gpt_utils.token_budget(self.model, self.max_tokens)
+        # A persisted message can outgrow the budget of a smaller model, forget it
+        while not session.trim(budget, self.conversation_limit):
+            session.pop()
 
-    def gpt_text(self, user_input: str) -> str:
+    def _ask_user(self, session, user_input: str) -> int:
         # Ask user
+        session.append({"role": "user", "content": f"{user_input}"})
+
+        # Limit conversation to what fits next to the reply while keeping system prompt
+        budget = gpt_utils.token_budget(self.model, self.max_tokens)
+        if not session.trim(budget, self.conversation_limit):
+            # The request would be rejected by the api, don't keep the question either
+            _, tokens = session.history[-1]
+            session.pop()
+            raise InputTooLong(session.system_tokens + tokens, budget)
+        return budget
+
+    def _cache_key(self, session, user_input: str):
+        # Only the opening question of a conversation has a context that other conversations share
+        if self.cache_mode == "off" or session.exchanges > 0:
+            return None
+        if self.cache_mode == "deterministic" and self.temperature != 0:
+            return None
+        params = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "stop": self.stop,
+        }
+        return CompletionCache.make_key(user_input, session.messages, params)
+
+    async def _lookup(self, cache_key: str):
+        cached = await self.cache.get(cache_key)
+        if cached is None:
+            flight = self.singleflight.join(cache_key)
+            if flight is not None:
+                try:
+                    cached = await flight
+                except FlightAbandoned:
+                    # The leader went away without an answer, ask on our own
+                    cached = None
+        return cached
 
-        self.messages.append({"role": "user", "content": f"{user_input}"})
+    def _lead(self, cache_key):
+        if cache_key is None:
+            return nullcontext()
+        return self.singleflight.lead(cache_key)
 
-        # Ask OpenAI
-        response = self.ask_openai()
+    async def _record(self, session, user_input: str, response: str, budget: int):
+        answer = {"role": "assistant", "content": response}
+        session.append(answer)
+        session.exchanges += 1
+        session.trim(budget, self.conversation_limit)
 
-        # Limit conversation while keeping system prompt
-        if len(self.messages) >= self.conversation_limit:
-            self.messages[2] = self.messages[0]
-            self.messages = self.messages[2:]
+        # Only complete exchanges are persisted, a failed question never reaches disk
+        if self.history is not None:
+            question = {"role": "user", "content": f"{user_input}"}
+            await asyncio.to_thread(
+                self.history.append, session.key, [question, answer]
+            )
 
+    def _reserve(self, session, user_id):
+        # Reserve the worst case up front, the unused part is refunded once usage is known
+        return self.scheduler.request(
+            user_id, self.model, session.tokens + (self.max_tokens or 0)
+        )
+
+    async def gpt_text(self, session_key: str, user_input: str, user_id=None) -> str:
+        session = self.sessions.get(session_key)
+
+        # Requests in the same conversation take turns, other conversations run concurrently
+        async with session.lock:
+            await self._hydrate(session)
+            cache_key = self._cache_key(session, user_input)
+            if cache_key is not None:
+                cached = await self._lookup(cache_key)
+                if cached is not None:
+                    budget = self._ask_user(session, user_input)
+                    await self._record(session, user_input, cached, budget)
+                    return cached
+
+            budget = self._ask_user(session, user_input)
+
+            # Ask OpenAI once the rate limiter lets the request through
+            try:
+                with self._lead(cache_key) as flight:
+                    async with self._reserve(session, user_id or session_key) as ticket:
+                        completion = await self.ask_openai(session.messages)
+                        ticket.settle(completion["usage"]["total_tokens"])
+                    response = completion["choices"][0]["message"]["content"]
+                    if flight is not None:
+                        flight.set_result(response)
+            except Exception:
+                session.pop()
+                raise
+
+            await self._record(session, user_input, response, budget)
+            if cache_key is not None:
+                await self.cache.set(cache_key, response)
+
+        self.sessions.enforce_limits(keep=session_key)
         return response
+
+    async def gpt_text_stream(self, session_key: str, user_input: str, user_id=None):
+        session = self.sessions.get(session_key)
+
+        async with session.lock:
+            await self._hydrate(session)
+            cache_key = self._cache_key(session, user_input)
+            if cache_key is not None:
+                cached = await self._lookup(cache_key)
+                if cached is not None:
+                    budget = self._ask_user(session, user_input)
+                    await self._record(session, user_input, cached, budget)
+                    yield cached
+                    return
+
+            budget = self._ask_user(session, user_input)
+
+            # Ask OpenAI, retries only happen before the first token arrives
+            parts = []
+            try:
+                with self._lead(cache_key) as flight:
+                    async with self._reserve(session, user_id or session_key) as ticket:
+                        prompt_tokens = session.tokens
+                        chunks = await self.ask_openai(session.messages, stream=True)
+                        async for chunk in chunks:
+                            delta = chunk["choices"][0]["delta"].get("content")
+                            if delta:
+                                parts.append(delta)
+                                yield delta
+                        # Streamed completions don't report usage, settle with an estimate
+                        ticket.settle(
+                            prompt_tokens
+                            + gpt_utils.count_tokens(
+                                {"content": "".join(parts)}, self.model
+                            )
+                        )
+                    response = "".join(parts)
+                    if flight is not None:
+                        flight.set_result(response)
+            except BaseException:
+                # Includes the caller abandoning the stream, the exchange is incomplete
+                session.pop()
+                raise
+
+            await self._record(session, user_input, response, budget)
+            if cache_key is not None:
+                await self.cache.set(cache_key, response)
+
+        self.sessions.enforce_limits(keep=session_key)
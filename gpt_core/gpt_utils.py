@@ -1,4 +1,10 @@
 import os
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
 
 
 def open_file(filepath):
@@ -29,3 +35,52 @@ def setup_personality(prompt=None):
         conversation.append({"role": "system", "content": f"{prompt}"})
 
     return conversation
+
+
+# Context window of each supported model in tokens
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-4-0314": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-32k-0314": 32768,
+    "gpt-3.5-turbo": 4096,
+    "gpt-3.5-turbo-0301": 4096,
+}
+
+# Every message is wrapped in a few formatting tokens, every reply is primed with 3 more
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+def token_budget(model, max_tokens):
+    """
+    The number of tokens a conversation may use so the reply still fits the model's context window
+    """
+    context = MODEL_CONTEXT_TOKENS.get(model, 4096)
+    return context - (max_tokens or 0) - TOKENS_PER_REPLY
+
+
+@lru_cache(maxsize=None)
+def _encoding_for(model):
+    # Resolved once per model, None when tiktoken or its encoding files aren't available
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding is downloaded on first use, without it the estimate is used
+        return None
+
+
+def count_tokens(message, model=None):
+    """
+    Count the number of tokens a chat message uses, without tiktoken it's estimated from
+    the UTF-8 size so CJK text and code are overcounted rather than undercounted
+    """
+    encoding = _encoding_for(model or "gpt-3.5-turbo")
+    if encoding is None:
+        return len(message["content"].encode("utf-8")) // 2 + TOKENS_PER_MESSAGE
+    return len(encoding.encode(message["content"])) + TOKENS_PER_MESSAGE
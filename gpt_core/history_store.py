@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+from typing import List
+
+
+class HistoryStore:
+    """
+    An append-only SQLite log of chatbot conversations, one history per session key
+
+    Nothing is read at startup, a session's newest messages are loaded the first time
+    it's used so restarts take the same time however many conversations exist.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        The SQLite file the histories are written to
+
+    Methods
+    -------
+    load(key, limit)
+        Read the newest messages of a session
+    append(key, messages)
+        Add messages to the end of a session's history
+    clear()
+        Remove every history
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY, session_key TEXT NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS messages_session ON messages (session_key, id)"
+        )
+        self._db.commit()
+
+    def load(self, key: str, limit: int) -> List:
+        """
+        Read the newest messages of a session
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A session key
+        limit : int
+            Maximum number of messages to read
+
+        Returns
+        -------
+        List
+            Chat messages, oldest first
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE session_key=? ORDER BY id DESC LIMIT ?",
+                (key, limit),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def append(self, key: str, messages: List):
+        """
+        Add messages to the end of a session's history
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A session key
+        messages : List
+            Chat messages to add
+        """
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO messages (session_key, role, content) VALUES (?,?,?)",
+                [(key, message["role"], message["content"]) for message in messages],
+            )
+            self._db.commit()
+
+    def clear(self):
+        """
+        Remove every history
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM messages")
+            self._db.commit()
@@ -1,8 +1,18 @@
-import random
 import time
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
 
 import openai
 
+# Requests and tokens per minute allowed for each model family, the longest matching prefix wins
+DEFAULT_LIMITS = {
+    "gpt-3.5-turbo": (3500, 90000),
+    "gpt-4": (200, 40000),
+    "gpt-4-32k": (200, 80000),
+}
+
 
 # define a retry decorator
 def retry_with_exponential_backoff(
@@ -13,9 +23,9 @@ def retry_with_exponential_backoff(
     max_retries: int = 10,
     errors: tuple = (openai.error.RateLimitError,),
 ):
-    """Retry a function with exponential backoff."""
+    """Retry a coroutine function with exponential backoff without blocking the event loop."""
 
-    def wrapper(*args, **kwargs):
+    async def wrapper(*args, **kwargs):
         # Initialize variables
         num_retries = 0
         delay = initial_delay
@@ -23,7 +33,7 @@ def retry_with_exponential_backoff(
         # Loop until a successful response or max_retries is hit or an exception is raised
         while True:
             try:
-                return func(*args, **kwargs)
+                return await func(*args, **kwargs)
 
             # Retry on specific errors
             except errors as e:
@@ -40,8 +50,8 @@ def retry_with_exponential_backoff(
                 # Increment the delay
                 delay *= exponential_base * (1 + jitter * random.random())
 
-                # Sleep for the delay
-                time.sleep(delay)
+                # Sleep for the delay, other commands keep running in the meantime
+                await asyncio.sleep(delay)
 
             # Raise exceptions for any errors not specified
             except Exception as e:
@@ -51,5 +61,207 @@ def retry_with_exponential_backoff(
 
 
 @retry_with_exponential_backoff
-def completions_with_backoff(**kwargs):
-    return openai.ChatCompletion.create(**kwargs)
+async def completions_with_backoff(**kwargs):
+    return await openai.ChatCompletion.acreate(**kwargs)
+
+
+class TokenBucket:
+    """
+    A bucket that refills continuously up to a per minute capacity
+
+    ...
+
+    Attributes
+    ----------
+    capacity : float
+        Maximum amount the bucket holds, the per minute limit
+    level : float
+        Amount currently available
+
+    Methods
+    -------
+    wait_time(amount)
+        Seconds until amount is available
+    consume(amount)
+        Take amount out of the bucket
+    refund(amount)
+        Put amount back into the bucket
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self._rate = per_minute / 60
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        # A request larger than the whole bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self._rate)
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def refund(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RequestTicket:
+    """
+    A granted request slot, used to correct the token estimate once the real usage is known
+
+    ...
+
+    Attributes
+    ----------
+    tokens : int
+        The number of tokens that were reserved
+
+    Methods
+    -------
+    settle(used_tokens)
+        Return reserved tokens that weren't used to the bucket
+    """
+
+    def __init__(self, bucket: TokenBucket, tokens: int):
+        self.tokens = tokens
+        self._bucket = bucket
+
+    def settle(self, used_tokens: int):
+        self._bucket.refund(self.tokens - used_tokens)
+        self.tokens = used_tokens
+
+
+class RequestScheduler:
+    """
+    Proactively limits OpenAI requests per model to stay under requests and tokens per minute,
+    queueing requests in arrival order with a cap on how many each user can have in flight.
+
+    ...
+
+    Attributes
+    ----------
+    limits : Dict
+        (requests per minute, tokens per minute) for each model prefix
+    per_user : int
+        Maximum number of requests a single user can have queued or in flight
+    waiting : int
+        Number of requests currently queued
+    granted : int
+        Number of requests that were let through
+    total_wait : float
+        Seconds spent queueing across all granted requests
+    max_wait : float
+        Longest time a granted request spent queueing
+
+    Methods
+    -------
+    request(user_id, model, tokens)
+        Async context manager that waits for a request slot for a user
+    stats()
+        Queue depth and wait time statistics
+    """
+
+    def __init__(self, limits: Optional[Dict] = None, per_user: int = 2):
+        self.limits = limits or DEFAULT_LIMITS
+        self.per_user = per_user
+        self.waiting = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        # model prefix -> (requests bucket, tokens bucket, head of line lock)
+        self._models = {}
+        # user id -> [semaphore, number of requests using it]
+        self._users = {}
+
+    def _limiter(self, model: str) -> Tuple[TokenBucket, TokenBucket, asyncio.Lock]:
+        prefix = max(
+            (prefix for prefix in self.limits if model.startswith(prefix)),
+            key=len,
+            default=model,
+        )
+        if prefix not in self._models:
+            rpm, tpm = self.limits.get(prefix, DEFAULT_LIMITS["gpt-4"])
+            self._models[prefix] = (TokenBucket(rpm), TokenBucket(tpm), asyncio.Lock())
+        return self._models[prefix]
+
+    @asynccontextmanager
+    async def request(self, user_id, model: str, tokens: int):
+        """
+        Wait for a request slot, the slot is held until the context exits
+
+        ...
+
+        Parameters
+        ----------
+        user_id : Any
+            The user making the request
+        model : str
+            The model the request is for
+        tokens : int
+            Estimated tokens the request will use, prompt plus max_tokens
+
+        Yields
+        ------
+        RequestTicket
+            The granted slot
+        """
+        requests, token_bucket, head_of_line = self._limiter(model)
+        user = self._users.setdefault(user_id, [asyncio.Semaphore(self.per_user), 0])
+        user[1] += 1
+
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with user[0]:
+                # asyncio.Lock wakes waiters in FIFO order, only the head of the queue polls the buckets
+                async with head_of_line:
+                    while True:
+                        wait = max(requests.wait_time(1), token_bucket.wait_time(tokens))
+                        if wait <= 0:
+                            break
+                        await asyncio.sleep(wait)
+                    requests.consume(1)
+                    token_bucket.consume(tokens)
+
+                waited = time.monotonic() - start
+                self.waiting -= 1
+                self.granted += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                start = None
+
+                yield RequestTicket(token_bucket, tokens)
+        finally:
+            if start is not None:
+                self.waiting -= 1
+            user[1] -= 1
+            if user[1] == 0:
+                del self._users[user_id]
+
+    def stats(self) -> Dict:
+        """
+        Queue depth and wait time statistics
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Requests queued and granted, average and longest wait in seconds
+        """
+        return {
+            "waiting": self.waiting,
+            "granted": self.granted,
+            "avg_wait": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait": self.max_wait,
+        }
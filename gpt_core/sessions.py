@@ -0,0 +1,283 @@
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+
+class InputTooLong(Exception):
+    """A message that doesn't fit the model's context window even on its own."""
+
+    def __init__(self, tokens: int, budget: int):
+        super().__init__(f"message uses {tokens} tokens, only {budget} fit")
+        self.tokens = tokens
+        self.budget = budget
+
+
+class Session:
+    """
+    A single conversation history belonging to a channel or user
+
+    The system prompt is pinned and never trimmed, the rest of the conversation is a
+    deque of (message, tokens) pairs so dropping the oldest message is O(1).
+
+    ...
+
+    Attributes
+    ----------
+    key : str
+        The key the session is stored under
+    system : Dict
+        The pinned system prompt
+    history : deque
+        (message, tokens) pairs that follow the system prompt, oldest first
+    tokens : int
+        Number of tokens held by the system prompt and history
+    system_tokens : int
+        Number of tokens held by the system prompt
+    exchanges : int
+        Number of questions the chatbot has answered in this session
+    last_used : float
+        Monotonic time the session was last retrieved
+    lock : asyncio.Lock
+        Serializes requests that belong to the same session
+    hydrated : bool
+        Whether the persisted history has been loaded into the session
+
+    Methods
+    -------
+    messages()
+        The conversation history to send to the model
+    append(message)
+        Add a message to the end of the conversation
+    pop()
+        Remove the newest message from the conversation
+    trim(token_budget, max_messages)
+        Drop the oldest messages until the conversation fits the budget
+    """
+
+    def __init__(self, key: str, messages: List, store: "SessionStore"):
+        self.key = key
+        self.history = deque()
+        self.exchanges = 0
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.hydrated = False
+        self._store = store
+
+        self.system = messages[0]
+        self.tokens = 0
+        self.system_tokens = store.count_tokens(self.system)
+        self._add_tokens(self.system_tokens)
+        for message in messages[1:]:
+            self.append(message)
+
+    def _add_tokens(self, tokens: int):
+        self.tokens += tokens
+        if self._store is not None:
+            self._store.total_tokens += tokens
+
+    @property
+    def messages(self) -> List:
+        return [self.system, *(message for message, _ in self.history)]
+
+    def append(self, message: Dict):
+        """
+        Add a message to the end of the conversation, counting its tokens once
+
+        ...
+
+        Parameters
+        ----------
+        message : Dict
+            A chat message
+        """
+        tokens = self._store.count_tokens(message) if self._store else 0
+        self.history.append((message, tokens))
+        self._add_tokens(tokens)
+
+    def pop(self) -> Dict:
+        """
+        Remove the newest message from the conversation
+
+        ...
+
+        Returns
+        -------
+        Dict
+            The message that was removed
+        """
+        message, tokens = self.history.pop()
+        self._add_tokens(-tokens)
+        return message
+
+    def trim(self, token_budget: int, max_messages: int) -> bool:
+        """
+        Drop the oldest messages until the conversation fits the budget, the system prompt
+        and newest message are always kept
+
+        ...
+
+        Parameters
+        ----------
+        token_budget : int
+            Maximum number of tokens the conversation may use
+        max_messages : int
+            Maximum number of messages including the system prompt
+
+        Returns
+        -------
+        bool
+            Whether the conversation fits, when the newest message can't fit even on its
+            own nothing is dropped
+        """
+        if self.history and self.system_tokens + self.history[-1][1] > token_budget:
+            return False
+        while len(self.history) > 1 and (
+            self.tokens > token_budget or len(self.history) + 1 > max_messages
+        ):
+            _, tokens = self.history.popleft()
+            self._add_tokens(-tokens)
+        return True
+
+
+class SessionStore:
+    """
+    Holds one conversation history per key with LRU, idle TTL and total token eviction
+
+    ...
+
+    Attributes
+    ----------
+    new_messages : Callable
+        Creates the starting conversation for a new session
+    count_tokens : Callable
+        Counts the tokens of a single message
+    max_sessions : int
+        Maximum number of sessions kept in memory
+    idle_ttl : float
+        Seconds a session may go unused before it gets evicted
+    max_tokens : int
+        Maximum number of approximate tokens held across all sessions
+    total_tokens : int
+        Approximate number of tokens currently held across all sessions
+    evicted : int
+        Number of sessions that were evicted
+
+    Methods
+    -------
+    get(key)
+        Retrieve the session for a key, creating it if needed
+    enforce_limits(keep=None)
+        Evict least recently used sessions until the store is within its limits
+    clear()
+        Remove every session
+    stats()
+        The number of sessions and tokens held by the store
+    """
+
+    def __init__(
+        self,
+        new_messages: Callable[[], List],
+        count_tokens: Callable[[Dict], int],
+        max_sessions: int = 1000,
+        idle_ttl: float = 3600,
+        max_tokens: int = 2_000_000,
+    ):
+        self.new_messages = new_messages
+        self.count_tokens = count_tokens
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_tokens = max_tokens
+        self.total_tokens = 0
+        self.evicted = 0
+
+        # Ordered from least to most recently used
+        self._sessions = OrderedDict()
+
+    def get(self, key: str) -> Session:
+        """
+        Retrieve the session for a key, creating it if needed
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A channel or user key
+
+        Returns
+        -------
+        Session
+            The session that belongs to the key
+        """
+        self._evict_idle()
+        session = self._sessions.get(key)
+        if session is None:
+            session = Session(key, self.new_messages(), self)
+            self._sessions[key] = session
+        else:
+            self._sessions.move_to_end(key)
+        session.last_used = time.monotonic()
+        self.enforce_limits(keep=key)
+        return session
+
+    def _evict(self, key: str):
+        session = self._sessions.pop(key)
+        self.total_tokens -= session.tokens
+        # An in-flight request may still update an evicted session, stop it counting towards the store
+        session._store = None
+        self.evicted += 1
+
+    def _evict_idle(self):
+        expire_before = time.monotonic() - self.idle_ttl
+        for key, session in list(self._sessions.items()):
+            if session.last_used > expire_before:
+                break
+            # A request still holds it, evicting now would drop the answer it's about to record
+            if not session.lock.locked():
+                self._evict(key)
+
+    def enforce_limits(self, keep: Optional[str] = None):
+        """
+        Evict least recently used sessions until the store is within its limits
+
+        ...
+
+        Parameters
+        ----------
+        keep : str, optional, default=None
+            A key that must not be evicted, usually the session currently in use, sessions
+            with a request in flight are never evicted either
+        """
+        for key, session in list(self._sessions.items()):
+            if (
+                len(self._sessions) <= self.max_sessions
+                and self.total_tokens <= self.max_tokens
+            ):
+                break
+            if key != keep and not session.lock.locked():
+                self._evict(key)
+
+    def clear(self):
+        """
+        Remove every session
+        """
+        for key in list(self._sessions):
+            self._evict(key)
+
+    def stats(self) -> Dict:
+        """
+        The number of sessions and tokens held by the store
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Session count, approximate tokens held and number of evictions
+        """
+        return {
+            "sessions": len(self._sessions),
+            "tokens": self.total_tokens,
+            "evicted": self.evicted,
+        }
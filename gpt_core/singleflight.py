@@ -0,0 +1,112 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class FlightAbandoned(Exception):
+    """The request in flight was cancelled or abandoned before it had a result."""
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight requests so only one of them reaches the api
+
+    ...
+
+    Attributes
+    ----------
+    calls : int
+        Number of requests that went upstream
+    coalesced : int
+        Number of requests that waited on another request's result instead
+
+    Methods
+    -------
+    join(key)
+        Wait on the request that's already in flight for a key
+    lead(key)
+        Context manager that registers the caller as the request in flight for a key
+    stats()
+        How many requests were coalesced
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    def join(self, key: str) -> Optional[asyncio.Future]:
+        """
+        Wait on the request that's already in flight for a key
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A request key
+
+        Returns
+        -------
+        asyncio.Future, None
+            An awaitable result if a request is in flight, cancelling it doesn't affect other callers
+        """
+        future = self._flights.get(key)
+        if future is None:
+            return None
+        self.coalesced += 1
+        return asyncio.shield(future)
+
+    @contextmanager
+    def lead(self, key: str):
+        """
+        Register the caller as the request in flight for a key, the caller must set the
+        yielded future's result, if it fails every joined caller gets the same error and
+        if it's cancelled or abandoned they get FlightAbandoned
+
+        ...
+
+        Parameters
+        ----------
+        key : str
+            A request key
+
+        Yields
+        ------
+        asyncio.Future
+            The future joined callers are waiting on
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may have joined, don't warn about an error that was never retrieved
+        future.add_done_callback(lambda f: f.exception())
+        self._flights[key] = future
+        self.calls += 1
+        try:
+            yield future
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            # Cancelling the future would cancel every joined caller along with it
+            if not future.done():
+                future.set_exception(FlightAbandoned(key))
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def stats(self) -> Dict:
+        """
+        How many requests were coalesced
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Requests sent upstream, requests coalesced and requests currently in flight
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
@@ -0,0 +1,327 @@
+import os
+import discord
+from discord import app_commands
+from typing import Dict, List, NamedTuple, Optional, Union
+
+# Number of options, subcommands or commands listed per help page
+PAGE_SIZE = 10
+
+
+def option_details(command_info: app_commands.Command, option: str) -> str:
+    """
+    Format and return details about a command's parameter.
+
+    Parameters
+    ----------
+    command_info : app_commands.Command
+        The command that the parameter belongs to
+    option: str
+        The command's parameter that needs parsing
+
+    Returns
+    -------
+    str
+        The formatted details that belong to a command's parameter
+    """
+    in_group = command_info.parent
+    param = command_info.get_parameter(option)
+    option_type = f"[{str(param.type).split('.')[1].upper()}]"
+    required = param.required
+    if not in_group:
+        command = param.command.name
+    else:
+        command = f"{in_group.name} {command_info.name}"
+    description = ""
+    format_param_desc = param.description.split("]")[1].strip()
+    if param.name != format_param_desc:
+        description = format_param_desc
+
+    return f"**Option**: {option}\n**Description**: {description}\n**Type**: {option_type}\n**Command**: `{command}`\n**Required**: {required}"
+
+
+class HelpPage(NamedTuple):
+    """The pre-rendered help of a command, group or category."""
+
+    header: str
+    pages: List[str]
+    count: int
+    messages: List[str]
+
+
+def render_page(header: str, lines: List[str]) -> HelpPage:
+    """
+    Split numbered lines into pages and render the message shown for every page
+
+    ...
+
+    Parameters
+    ----------
+    header : str
+        The text shown above every page
+    lines : List[str]
+        One line per option, subcommand or command
+
+    Returns
+    -------
+    HelpPage
+        The pages and their rendered messages
+    """
+    pages = [
+        "\n".join(lines[i : i + PAGE_SIZE]) for i in range(0, len(lines), PAGE_SIZE)
+    ]
+    if len(pages) == 1:
+        messages = [f"{header}```{pages[0]}```"]
+    else:
+        messages = [
+            f"{header}```Page {number}/{len(pages)}\n{page}```"
+            for number, page in enumerate(pages, start=1)
+        ]
+    return HelpPage(header, pages, len(lines), messages)
+
+
+def render_command(cmd_info: app_commands.Command) -> HelpPage:
+    """The help of a command and its options."""
+    desc = cmd_info.description
+    in_grp = cmd_info.parent
+    name = cmd_info.name if not in_grp else f"{in_grp.name} {cmd_info.name}"
+    if not cmd_info.parameters:
+        message = f"**Command**: `{name}`\n**Description**: {desc}"
+        return HelpPage(message, [], 0, [message])
+
+    lines = []
+    for count, param in enumerate(cmd_info.parameters, start=1):
+        split_desc = param.description.split("]")
+        if param.name != split_desc[1].strip():
+            lines.append(f"{count} : {param.name}{split_desc[0]}] -{split_desc[1]}")
+        else:
+            lines.append(f"{count} : {param.name}{split_desc[0]}]")
+    return render_page(
+        f"**Command**: `{name}`\n**Description**: {desc}\n\n**Options**:\n", lines
+    )
+
+
+def render_group(cmd_info: app_commands.Group) -> HelpPage:
+    """The help of a group and its subcommands."""
+    lines = []
+    for count, command in enumerate(cmd_info.commands, start=1):
+        if command.description != "":
+            lines.append(f"{count} : {command.name} - {command.description}")
+        else:
+            lines.append(f"{count} : {command.name}")
+    return render_page(
+        f"**Command**: `{cmd_info.name}`\n**Description**: {cmd_info.description}\n\n**Sub Commands**:\n",
+        lines,
+    )
+
+
+class VersionedTree(app_commands.CommandTree):
+    """
+    A command tree that counts its changes so caches built from it know when they're stale
+
+    ...
+
+    Attributes
+    ----------
+    version : int
+        Incremented every time a command is added or removed
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def add_command(self, *args, **kwargs):
+        super().add_command(*args, **kwargs)
+        self.version += 1
+
+    def remove_command(self, *args, **kwargs):
+        removed = super().remove_command(*args, **kwargs)
+        self.version += 1
+        return removed
+
+    def clear_commands(self, *args, **kwargs):
+        super().clear_commands(*args, **kwargs)
+        self.version += 1
+
+    def copy_global_to(self, *args, **kwargs):
+        super().copy_global_to(*args, **kwargs)
+        self.version += 1
+
+
+class HelpCatalog:
+    """
+    Everything /help shows, indexed case-insensitively and rendered once per tree change
+
+    ...
+
+    Attributes
+    ----------
+    bot : commands.Bot
+        The discord bot, its tree and help_dict are the catalog's source
+
+    Methods
+    -------
+    invalidate()
+        Mark the catalog as stale, it's rebuilt on next use
+    is_command(name)
+        Whether a name is a top level command
+    is_category(name)
+        Whether a name is a category
+    command(name)
+        A command, group or subcommand by its qualified name
+    page(name)
+        The help of a command, group or subcommand
+    category(name)
+        The help of a category
+    option(name, option)
+        The details of a command's option
+    overview(application)
+        The embed shown by /help without input
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._version = None
+        self._commands: Dict[str, Union[app_commands.Command, app_commands.Group]] = {}
+        self._pages: Dict[str, HelpPage] = {}
+        self._categories: Dict[str, HelpPage] = {}
+        self._options: Dict[tuple, str] = {}
+        self._overview: Optional[discord.Embed] = None
+
+    def invalidate(self):
+        """
+        Mark the catalog as stale, it's rebuilt on next use
+        """
+        self._version = None
+
+    def _ensure(self):
+        # A tree that doesn't count its changes can't tell when the catalog is stale
+        version = getattr(self.bot.tree, "version", None)
+        if version is None or self._version != version:
+            self._build()
+            self._version = version
+
+    def _build(self):
+        commands = {}
+        pages = {}
+        options = {}
+        for category_commands in self.bot.help_dict.values():
+            for name in category_commands:
+                cmd_info = self.bot.tree.get_command(name)
+                if cmd_info is None:
+                    continue
+                entries = [cmd_info]
+                if isinstance(cmd_info, app_commands.Group):
+                    entries.extend(cmd_info.commands)
+                for entry in entries:
+                    key = entry.qualified_name.lower()
+                    commands[key] = entry
+                    if isinstance(entry, app_commands.Group):
+                        pages[key] = render_group(entry)
+                        continue
+                    pages[key] = render_command(entry)
+                    for param in entry.parameters:
+                        options[(key, param.name.lower())] = option_details(
+                            entry, param.name
+                        )
+
+        categories = {}
+        for category, names in self.bot.help_dict.items():
+            lines = []
+            for count, name in enumerate(sorted(names), start=1):
+                cmd_info = commands.get(name.lower())
+                if cmd_info is None:
+                    continue
+                if len(cmd_info.description) > 0:
+                    lines.append(f"{count} : {cmd_info.name} - {cmd_info.description}")
+                else:
+                    lines.append(f"{count} : {cmd_info.name}")
+            if lines:
+                categories[category.lower()] = render_page(
+                    f"{category.capitalize()}\n", lines
+                )
+
+        self._commands = commands
+        self._pages = pages
+        self._options = options
+        self._categories = categories
+        self._overview = None
+
+    def is_command(self, name: str) -> bool:
+        """Whether a name is a top level command."""
+        self._ensure()
+        name = name.lower()
+        return name in self._commands and " " not in name
+
+    def is_category(self, name: str) -> bool:
+        """Whether a name is a category."""
+        self._ensure()
+        return name.lower() in self._categories
+
+    def command(
+        self, name: str
+    ) -> Optional[Union[app_commands.Command, app_commands.Group]]:
+        """A command, group or subcommand by its qualified name, None if unknown."""
+        self._ensure()
+        return self._commands.get(" ".join(name.lower().split()))
+
+    def page(self, name: str) -> Optional[HelpPage]:
+        """The help of a command, group or subcommand by its qualified name, None if unknown."""
+        self._ensure()
+        return self._pages.get(" ".join(name.lower().split()))
+
+    def category(self, name: str) -> Optional[HelpPage]:
+        """The help of a category, None if unknown."""
+        self._ensure()
+        return self._categories.get(name.lower())
+
+    def option(self, name: str, option: str) -> Optional[str]:
+        """The details of a command's option, None if unknown."""
+        self._ensure()
+        return self._options.get((" ".join(name.lower().split()), option.lower()))
+
+    def overview(self, application: discord.AppInfo) -> discord.Embed:
+        """
+        The embed shown by /help without input, rendered on first use
+
+        ...
+
+        Parameters
+        ----------
+        application : discord.AppInfo
+            The bot's application, for its name and icon
+
+        Returns
+        -------
+        discord.Embed
+            The list of every category and its commands
+        """
+        self._ensure()
+        if self._overview is not None:
+            return self._overview
+
+        invite_url = os.getenv("INVITE_URL")
+        bot_name = application.name
+        avatar_url = application.icon.url
+        description = f"""Below you can see all the commands I know.
+        If you have any questions or comments about something ask on [Github](https://github.com/mtzim/discord-bot).\n
+        [Invite Me]({invite_url})\n
+        **Have a nice day!**"""
+        trailing_text = """\n\n`help commandName` - Command Details
+        `help commandName subCommandName` - Sub Command Details
+        `help commandName optionName` - Option Details
+        `help categoryName` - Category Details"""
+        embedMsg = discord.Embed(color=discord.Color.blue())
+        embedMsg.set_author(name=f"Hello! I'm {bot_name}!", icon_url=f"{avatar_url}")
+        embedMsg.set_thumbnail(url=avatar_url)
+        embedMsg.description = description
+        # Sort category names alphabetically
+        for category in sorted(self.bot.help_dict):
+            value = ", ".join(
+                f"`{command}`" for command in sorted(self.bot.help_dict[category])
+            )
+            embedMsg.add_field(name=category.upper(), value=value, inline=False)
+        # \u2800 is an invisible unicode character, can also maybe use \u200b
+        embedMsg.add_field(name="\u2800", value=f"{trailing_text}", inline=False)
+        self._overview = embedMsg
+        return embedMsg
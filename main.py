@@ -2,13 +2,72 @@ import os
 import logging
 import discord
 from discord import Message, Intents, Guild
-from db_helper import SqlHelper as SQL
+from db_helper import AsyncSqlHelper as SQL, GuildWriteQueue, get_pool, guild_cache
+from help_catalog import HelpCatalog, VersionedTree
+from startup_profiler import StartupProfiler
+from sync_engine import SyncEngine
 from dotenv import load_dotenv
-from typing import Union, Literal, Optional
+from typing import Dict, Iterable, List, Union, Literal, Optional
+from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Greedy, Context
 
 
+def add_to_help_dict(
+    help_dict: Dict[str, List[str]],
+    slash_commands: Iterable[Union[app_commands.Command, app_commands.Group]],
+) -> None:
+    """
+    Add slash commands to the category their cog declared through the module extra
+
+    ...
+
+    Parameters
+    ----------
+    help_dict : Dict[str, List[str]]
+        Categories as keys and the names of the commands belonging to them as values
+    slash_commands : Iterable[Union[app_commands.Command, app_commands.Group]]
+        The commands to add, commands without a module are left out of /help
+    """
+    for command in slash_commands:
+        category = command.extras.get("module")
+        if category is None:
+            continue
+        names = help_dict.setdefault(category, [])
+        if command.name not in names:
+            names.append(command.name)
+
+
+def remove_from_help_dict(
+    help_dict: Dict[str, List[str]],
+    slash_commands: Iterable[Union[app_commands.Command, app_commands.Group]],
+) -> None:
+    """
+    Remove slash commands from their category, dropping categories left empty
+
+    ...
+
+    Parameters
+    ----------
+    help_dict : Dict[str, List[str]]
+        Categories as keys and the names of the commands belonging to them as values
+    slash_commands : Iterable[Union[app_commands.Command, app_commands.Group]]
+        The commands to remove
+    """
+    for command in slash_commands:
+        category = command.extras.get("module")
+        names = help_dict.get(category)
+        if names is None or command.name not in names:
+            continue
+        names.remove(command.name)
+        if not names:
+            del help_dict[category]
+
+
+# Resolved from this file so the bot starts from any working directory
+COGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cogs")
+
+
 class CustomBot(commands.Bot):
     """
     Represents a custom Discord bot.
@@ -21,23 +80,33 @@ class CustomBot(commands.Bot):
         List of Cogs to load
     help_dict : Dict
         Dictionary that contains all categories as a key and commands that belong to that category as a value
+    help_catalog : HelpCatalog
+        The pre-rendered pages of /help, rebuilt when the command tree or help_dict change
+    guild_writes : GuildWriteQueue
+        Write-behind queue that batches guild join, leave and rename events into the database
+    sync_engine : SyncEngine
+        Syncs the command tree to Discord, skipping scopes whose commands didn't change
 
     Methods
     -------
     get_prefix(message)
-        Retreives the prefix that's stored in the database for non-slash commands
+        Retreives the guild's prefix from the guild settings cache for non-slash commands
     setup_hook()
-        Loads all of the cogs stored in initial_extensions
+        Loads the guild settings cache, starts the guild write queue, loads all of the cogs stored in initial_extensions and builds help_dict
+    add_cog(cog)
+        Adds a cog and its slash commands to help_dict
+    remove_cog(name)
+        Removes a cog and its slash commands from help_dict
     close()
-        Closes the Bot's connection to Discord
+        Closes the Bot's connection to Discord and drains the guild write queue
     on_ready()
         Ensures that all guild information contained in the database is in sync with all guilds the Bot is a member of
     on_guild_join(guild)
-        Add a guild's name and id to the database when the Bot joins or creates a guild
+        Queues adding a guild's name and id to the database when the Bot joins or creates a guild
     on_guild_remove(guild)
-        Removes a guild's entry from the database when a guild is removed from the Bot
+        Queues removing a guild's entry from the database when a guild is removed from the Bot
     on_guild_update(before,after)
-        Updates the guild name in the database to match the server's guild name if it changes
+        Queues updating the guild name in the database to match the server's guild name if it changes
     """
 
     def __init__(self, *args, **kwargs):
@@ -50,20 +119,29 @@ class CustomBot(commands.Bot):
         if "command_prefix" not in kwargs:
             kwargs["command_prefix"] = self.get_prefix
 
+        # The tree counts its changes so the help catalog knows when to rebuild
+        kwargs.setdefault("tree_cls", VersionedTree)
+
         super().__init__(*args, help_command=None, **kwargs)
 
         # Load all cogs
         self.initial_extensions = [
             "".join(f"cogs.{os.path.splitext(cog)[0]}")
-            for cog in os.listdir("./cogs")
-            if os.path.isfile(os.path.join("./cogs", cog)) and cog.endswith(".py")
+            for cog in os.listdir(COGS_DIR)
+            if os.path.isfile(os.path.join(COGS_DIR, cog)) and cog.endswith(".py")
         ]
 
         self.help_dict = {}
+        self.help_catalog = HelpCatalog(self)
+        self.guild_writes = GuildWriteQueue()
+        self.sync_engine = SyncEngine(
+            self.tree,
+            path=os.getenv("COMMAND_SYNC_PATH") or "./data/command_sync.json",
+        )
 
     async def get_prefix(self, message: Message, /) -> Union[str, None]:
         """
-        Retreives the prefix that's stored in the database for non-slash commands
+        Retreives the guild's prefix from the guild settings cache for non-slash commands
 
         ...
 
@@ -77,23 +155,75 @@ class CustomBot(commands.Bot):
         prefix : str, None
             A prefix that the bot is listening for
         """
-        db = SQL()
-        prefix = db.get_prefix(message.guild.id)
-        db.close()
-        return prefix
+        return guild_cache.get_prefix(message.guild.id)
 
     async def setup_hook(self):
         """
-        Loads all of the cogs stored in initial_extensions
+        Loads the guild settings cache, starts the guild write queue, loads all of the cogs stored in initial_extensions and builds help_dict
         """
+        await SQL().run(guild_cache.load)
+        self.guild_writes.start()
+
+        # STARTUP_PROFILE reports how long every cog takes to import and set up
+        profiler = StartupProfiler() if os.getenv("STARTUP_PROFILE") else None
         for ext in self.initial_extensions:
-            await self.load_extension(ext)
+            if profiler is None:
+                await self.load_extension(ext)
+            else:
+                await profiler.load(self, ext)
+        if profiler is not None:
+            print(profiler.report())
+
+        # One pass over the whole tree also picks up commands added outside of cogs
+        # i.e. help = {"General": ["ping","help","prefix"], "Utility": ["avatar","userinfo"]}
+        help_dict = {}
+        add_to_help_dict(help_dict, self.tree.get_commands())
+        self.help_dict = help_dict
+        self.help_catalog.invalidate()
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs):
+        """
+        Adds a cog and its slash commands to help_dict
+
+        ...
+
+        Parameters
+        ----------
+        cog : commands.Cog
+            The cog to add
+        """
+        await super().add_cog(cog, **kwargs)
+        add_to_help_dict(self.help_dict, cog.get_app_commands())
+        self.help_catalog.invalidate()
+
+    async def remove_cog(self, name: str, /, **kwargs) -> Optional[commands.Cog]:
+        """
+        Removes a cog and its slash commands from help_dict
+
+        ...
+
+        Parameters
+        ----------
+        name : str
+            The name of the cog to remove
+
+        Returns
+        -------
+        cog : commands.Cog, None
+            The removed cog, None if no cog had the name
+        """
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            remove_from_help_dict(self.help_dict, cog.get_app_commands())
+            self.help_catalog.invalidate()
+        return cog
 
     async def close(self):
         """
-        Closes the Bot's connection to Discord
+        Closes the Bot's connection to Discord and drains the guild write queue
         """
         await super().close()
+        await self.guild_writes.close()
 
     async def on_ready(self):
         """
@@ -110,15 +240,15 @@ class CustomBot(commands.Bot):
                 print(
                     f"{count+1}) {guild.name}#{guild.id} - Members: {len(guild.members)}"
                 )
-                db = SQL()
-                db.add_guild(guild.name, guild.id)
 
-            db.check_guilds_remove(guilds_in)
-            db.close()
+            synced = await SQL().reconcile_guilds(guilds_in)
+            print(
+                f"Synced guilds with the database in {synced['seconds']:.2f}s: {synced['added']} added, {synced['removed']} removed, {synced['renamed']} renamed"
+            )
 
     async def on_guild_join(self, guild: Guild):
         """
-        Add a guild's name and id to the database when the Bot joins or creates a guild
+        Queues adding a guild's name and id to the database when the Bot joins or creates a guild
 
         ...
 
@@ -127,13 +257,11 @@ class CustomBot(commands.Bot):
         guild : discord.Guild
             The guild that was joined
         """
-        db = SQL()
-        db.add_guild(guild.name, guild.id)
-        db.close()
+        self.guild_writes.add_guild(guild.name, guild.id)
 
     async def on_guild_remove(self, guild: Guild):
         """
-        Removes a guild's entry from the database when a guild is removed from the Bot
+        Queues removing a guild's entry from the database when a guild is removed from the Bot
 
         ...
 
@@ -142,13 +270,11 @@ class CustomBot(commands.Bot):
         guild : discord.Guild
             The guild that got removed
         """
-        db = SQL()
-        db.delete_guild(guild.id)
-        db.close()
+        self.guild_writes.delete_guild(guild.id)
 
     async def on_guild_update(self, before: Guild, after: Guild):
         """
-        Updates the guild name in the database to match the server's guild name if it changes
+        Queues updating the guild name in the database to match the server's guild name if it changes
 
         ...
 
@@ -160,9 +286,7 @@ class CustomBot(commands.Bot):
             The guild after being updated
         """
         if before.name != after.name:
-            db = SQL()
-            db.update_guild_name(after.name, after.id)
-            db.close()
+            self.guild_writes.update_guild_name(after.name, after.id)
 
 
 def load_commands(bot: commands.Bot):
@@ -192,6 +316,28 @@ def load_commands(bot: commands.Bot):
         """
         await ctx.bot.close()
 
+    @bot.command(hidden=True)
+    @commands.is_owner()
+    async def stats(ctx: commands.Context):
+        """
+        Show the Discord Bot's internal statistics
+
+        ...
+
+        Parameters
+        ----------
+        ctx : commands.Context
+            Context in which the command is being invoked under
+        """
+        cache = guild_cache.stats()
+        pool = get_pool().stats()
+        writes = ctx.bot.guild_writes.stats()
+        await ctx.send(
+            f"Guild cache: `{cache['guilds']}` guilds, `{cache['hits']}` hits, `{cache['misses']}` misses, `{cache['hit_rate']:.1%}` hit rate\n"
+            f"DB pool: `{pool['in_use']}/{pool['size']}` in use, `{pool['idle']}` idle, `{pool['open']}` open, `{pool['recycled']}` recycled\n"
+            f"Guild writes: `{writes['pending']}` pending, `{writes['flushed']}` flushed, `{writes['coalesced']}` coalesced"
+        )
+
     # Sync slash commands globally or to specific guilds
     @bot.command(hidden=True)
     @commands.guild_only()
@@ -202,7 +348,7 @@ def load_commands(bot: commands.Bot):
         spec: Optional[Literal["~", "*", "^"]] = None,
     ) -> None:
         """
-        Syncs the slash commands to Discord and creates a dictionary that contains all categories and the commands belonging to them,
+        Syncs the slash commands to Discord, scopes whose commands didn't change since their last sync are skipped,
         calling this command by itself will perform a global sync
 
         ...
@@ -216,58 +362,34 @@ def load_commands(bot: commands.Bot):
         spec : Literal["~", "*", "^"], optional, default = None
             The special character that determines how the commands will get synced
             ~ - sync current guild
-            * - copies all global app commands to current guild, creates a help dictionary, and syncs
+            * - copies all global app commands to current guild and syncs
             ^ - clears all commands from the current guild target and syncs (removes guild commands)
         """
 
-        def make_help_dict(bot: CustomBot) -> None:
-            if not bot.help_dict:
-                slash_commands = bot.tree.get_commands()
-                for x in slash_commands:
-                    if "module" in x.extras.keys():
-                        cmd_category = x.extras["module"]
-                        if cmd_category not in bot.help_dict:
-                            bot.help_dict[cmd_category] = [x.name]
-                        else:
-                            hlist_vals = bot.help_dict[cmd_category]
-                            hlist_vals.append(x.name)
-                            bot.help_dict[cmd_category] = hlist_vals
-
+        engine = ctx.bot.sync_engine
         if not guilds:
             if spec == "~":
-                synced = await ctx.bot.tree.sync(guild=ctx.guild)
-                make_help_dict(ctx.bot)
+                report = await engine.sync([ctx.guild])
             elif spec == "*":
                 ctx.bot.tree.copy_global_to(guild=ctx.guild)
-                synced = await ctx.bot.tree.sync(guild=ctx.guild)
-                # use to form help command
-                # i.e. help = {"General": ["ping","help","prefix"], "Utility": ["avatar","userinfo"]}
-                make_help_dict(ctx.bot)
+                report = await engine.sync([ctx.guild])
             elif spec == "^":
                 ctx.bot.tree.clear_commands(guild=ctx.guild)
-                await ctx.bot.tree.sync(guild=ctx.guild)
-                synced = []
-                make_help_dict(ctx.bot)
+                report = await engine.sync([ctx.guild])
             else:
-                synced = await ctx.bot.tree.sync()
-                make_help_dict(ctx.bot)
+                report = await engine.sync()
+        else:
+            report = await engine.sync(guilds)
 
-            await ctx.send(
-                f"Synced {len(synced)} commands {'globally' if spec is None else 'to the current guild.'}"
-            )
-            return
-
-        ret = 0
-        for guild in guilds:
-            try:
-                await ctx.bot.tree.sync(guild=guild)
-                make_help_dict(ctx.bot)
-            except discord.HTTPException:
-                pass
-            else:
-                ret += 1
-
-        await ctx.send(f"Synced the tree to {ret}/{len(guilds)}.")
+        # Unchanged scopes are skipped, delete the sync state file to force an upload
+        lines = [
+            f"Synced `{len(report.synced)}`, skipped `{len(report.skipped)}` unchanged, `{len(report.failed)}` failed"
+        ]
+        for result in report.synced:
+            lines.append(f"Synced {result.commands} commands to `{result.scope}`")
+        for result in report.failed:
+            lines.append(f"Failed to sync `{result.scope}`: {result.error}")
+        await ctx.send("\n".join(lines))
 
 
 # Changes to async in discord.py 2.0
@@ -0,0 +1,172 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+# Discord only bulk deletes 2 to 100 messages at a time, all younger than 14 days
+BULK_DELETE_MAX = 100
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+
+class PruneDeleter:
+    """
+    Deletes messages while they're still being fetched, recent messages in bulk batches
+    and older ones one by one at a steady pace
+
+    Messages are queued with put, a worker per lane consumes them concurrently. The
+    queues are bounded so a fast producer waits for deletion to catch up instead of
+    buffering the whole channel.
+
+    ...
+
+    Attributes
+    ----------
+    bulk_delete : Callable
+        Deletes a list of recent messages in one request, usually channel.delete_messages
+    bulk_size : int
+        Maximum number of messages per bulk request
+    single_interval : float
+        Seconds to wait between single message deletes
+    margin : timedelta
+        How long before the bulk delete age limit a message is already deleted singly
+    deleted : int
+        Number of messages deleted
+    bulk_requests : int
+        Number of bulk delete requests sent
+    single_requests : int
+        Number of single delete requests sent
+    failed : int
+        Number of messages that couldn't be deleted
+
+    Methods
+    -------
+    start()
+        Start the deletion workers
+    put(msg)
+        Queue a message for deletion
+    close()
+        Delete everything still queued and stop the workers
+    stats()
+        Deletion counters
+    """
+
+    def __init__(
+        self,
+        bulk_delete: Callable[[List], Awaitable],
+        bulk_size: int = BULK_DELETE_MAX,
+        single_interval: float = 1.0,
+        margin: timedelta = timedelta(minutes=5),
+        max_pending: int = 2 * BULK_DELETE_MAX,
+    ):
+        self.bulk_delete = bulk_delete
+        self.bulk_size = min(bulk_size, BULK_DELETE_MAX)
+        self.single_interval = single_interval
+        self.margin = margin
+        self.deleted = 0
+        self.bulk_requests = 0
+        self.single_requests = 0
+        self.failed = 0
+
+        self._bulk = asyncio.Queue(max_pending)
+        self._single = asyncio.Queue(max_pending)
+        self._tasks = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        """
+        Start the deletion workers
+        """
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._bulk_worker()),
+                asyncio.create_task(self._single_worker()),
+            ]
+
+    async def put(self, msg):
+        """
+        Queue a message for deletion, waits while the lane it belongs to is full
+
+        ...
+
+        Parameters
+        ----------
+        msg : discord.Message
+            The message to delete
+        """
+        cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE + self.margin
+        if msg.created_at > cutoff:
+            await self._bulk.put(msg)
+        else:
+            await self._single.put(msg)
+
+    async def close(self):
+        """
+        Delete everything still queued and stop the workers
+        """
+        if not self._tasks:
+            return
+        # The bulk lane may still hand failed batches to the single lane, stop it first
+        await self._bulk.put(None)
+        await self._tasks[0]
+        await self._single.put(None)
+        await self._tasks[1]
+        self._tasks = []
+
+    async def _bulk_worker(self):
+        batch = []
+        while True:
+            msg = await self._bulk.get()
+            if msg is not None:
+                batch.append(msg)
+            if batch and (msg is None or len(batch) >= self.bulk_size):
+                await self._delete_batch(batch)
+                batch = []
+            if msg is None:
+                return
+
+    async def _delete_batch(self, batch: List):
+        self.bulk_requests += 1
+        try:
+            await self.bulk_delete(batch)
+        except Exception:
+            # A message aged past the limit or vanished, retry the batch one by one
+            for msg in batch:
+                await self._single.put(msg)
+            return
+        self.deleted += len(batch)
+
+    async def _single_worker(self):
+        while True:
+            msg = await self._single.get()
+            if msg is None:
+                return
+            self.single_requests += 1
+            try:
+                await msg.delete()
+                self.deleted += 1
+            except Exception:
+                self.failed += 1
+            await asyncio.sleep(self.single_interval)
+
+    def stats(self) -> Dict:
+        """
+        Deletion counters
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Messages deleted and failed, bulk and single requests sent
+        """
+        return {
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "bulk_requests": self.bulk_requests,
+            "single_requests": self.single_requests,
+        }
@@ -0,0 +1,300 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from .predicate import INVITE_PATTERN, PrunePredicate
+
+DISCORD_EPOCH = 1420070400000
+
+# Message properties kept as bits of a single int
+FLAG_ATTACHMENTS = 1
+FLAG_EMBEDS = 2
+FLAG_INVITE = 4
+FLAG_PINNED = 8
+FLAG_SYSTEM = 16
+FLAG_BOT = 32
+
+# Gap of a query the index can't answer any of, history has to be read from the newest message
+NEWEST = -1
+
+
+def time_to_id(when: datetime) -> int:
+    """The smallest message id that could have been created at a point in time."""
+    return int(when.timestamp() * 1000 - DISCORD_EPOCH) << 22
+
+
+def hash_words(content: str) -> FrozenSet[int]:
+    """The hashed whitespace separated words of a message, matching PrunePredicate's filter."""
+    return frozenset(hash(word) for word in content.split())
+
+
+class IndexEntry(NamedTuple):
+    """What the index remembers about a message, enough to evaluate every prune rule but filter phrases."""
+
+    id: int
+    author_id: int
+    flags: int
+    words: FrozenSet[int]
+
+
+def entry_matcher(predicate: PrunePredicate) -> Optional[Callable[[IndexEntry], bool]]:
+    """
+    Compile the options of a prune predicate into a check on index entries
+
+    ...
+
+    Parameters
+    ----------
+    predicate : PrunePredicate
+        The compiled prune options
+
+    Returns
+    -------
+    Optional[Callable]
+        Whether an entry is targeted, None when the options need the message content,
+        which is the case for a filter of more than one word
+    """
+    attachments, bots, embeds, filter, invites, pinned, system, user_id = predicate.key
+    if filter and len(filter.split()) != 1:
+        return None
+    word = hash(filter) if filter else None
+    mask = (
+        (FLAG_ATTACHMENTS if attachments else 0)
+        | (FLAG_EMBEDS if embeds else 0)
+        | (FLAG_INVITE if invites else 0)
+        | (FLAG_SYSTEM if system else 0)
+        | (FLAG_BOT if bots else 0)
+    )
+    any_rule = bool(mask or word is not None or user_id is not None)
+
+    def matches(entry: IndexEntry) -> bool:
+        if entry.flags & FLAG_PINNED and not pinned:
+            return False
+        if not any_rule:
+            return True
+        return bool(
+            entry.flags & mask
+            or (user_id is not None and entry.author_id == user_id)
+            or (word is not None and word in entry.words)
+        )
+
+    return matches
+
+
+class IndexQuery(NamedTuple):
+    """The result of an index lookup and the part of the range the index can't answer."""
+
+    matches: List[IndexEntry]
+    scanned: int
+    gap_before: Optional[int]
+
+
+class _ChannelIndex:
+    def __init__(self, oldest_complete: int):
+        # message id -> entry, ordered from oldest to newest
+        self.entries = OrderedDict()
+        # Every message with an id at or above this one is in entries
+        self.oldest_complete = oldest_complete
+
+
+class MessageIndex:
+    """
+    A compact per channel ring buffer of message metadata, fed by gateway events
+
+    Only messages seen since the bot connected are indexed, each channel remembers the
+    id from which on it has seen every message, anything older is a gap that has to be
+    read from history.
+
+    ...
+
+    Attributes
+    ----------
+    per_channel : int
+        Maximum number of messages remembered per channel
+
+    Methods
+    -------
+    add(msg)
+        Index a new message
+    update(channel_id, message_id, data)
+        Apply an edit from a raw message update payload
+    remove(channel_id, message_ids)
+        Forget deleted messages
+    clear()
+        Forget everything, used when events may have been missed
+    query(channel_id, matches, limit=None, after_id=None, before_id=None)
+        Find the indexed messages of a range that match a predicate
+    stats()
+        The number of channels and messages indexed
+    """
+
+    def __init__(self, per_channel: int = 10000):
+        self.per_channel = per_channel
+        self._channels: Dict[int, _ChannelIndex] = {}
+
+    def add(self, msg):
+        """
+        Index a new message
+
+        ...
+
+        Parameters
+        ----------
+        msg : discord.Message
+            A message that was just sent
+        """
+        channel = self._channels.get(msg.channel.id)
+        if channel is None:
+            channel = self._channels[msg.channel.id] = _ChannelIndex(msg.id)
+        flags = (
+            (FLAG_ATTACHMENTS if msg.attachments else 0)
+            | (FLAG_EMBEDS if msg.embeds else 0)
+            | (FLAG_INVITE if INVITE_PATTERN.search(msg.content) else 0)
+            | (FLAG_PINNED if msg.pinned else 0)
+            | (FLAG_SYSTEM if msg.is_system() else 0)
+            | (FLAG_BOT if msg.author.bot else 0)
+        )
+        channel.entries[msg.id] = IndexEntry(
+            msg.id, msg.author.id, flags, hash_words(msg.content)
+        )
+        if len(channel.entries) > self.per_channel:
+            oldest, _ = channel.entries.popitem(last=False)
+            channel.oldest_complete = oldest + 1
+
+    def update(self, channel_id: int, message_id: int, data: Dict):
+        """
+        Apply an edit from a raw message update payload, fields it doesn't carry stay as they are
+
+        ...
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel of the message
+        message_id : int
+            The edited message
+        data : Dict
+            The raw message update payload
+        """
+        channel = self._channels.get(channel_id)
+        entry = channel.entries.get(message_id) if channel else None
+        if entry is None:
+            return
+        flags = entry.flags
+        words = entry.words
+        for key, flag in (
+            ("attachments", FLAG_ATTACHMENTS),
+            ("embeds", FLAG_EMBEDS),
+            ("pinned", FLAG_PINNED),
+        ):
+            if key in data:
+                flags = flags | flag if data[key] else flags & ~flag
+        if "content" in data:
+            words = hash_words(data["content"])
+            if INVITE_PATTERN.search(data["content"]):
+                flags |= FLAG_INVITE
+            else:
+                flags &= ~FLAG_INVITE
+        channel.entries[message_id] = entry._replace(flags=flags, words=words)
+
+    def remove(self, channel_id: int, message_ids: Iterable[int]):
+        """
+        Forget deleted messages
+
+        ...
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel the messages were deleted from
+        message_ids : Iterable[int]
+            The deleted messages
+        """
+        channel = self._channels.get(channel_id)
+        if channel is not None:
+            for message_id in message_ids:
+                channel.entries.pop(message_id, None)
+
+    def clear(self):
+        """
+        Forget everything, used when events may have been missed
+        """
+        self._channels.clear()
+
+    def query(
+        self,
+        channel_id: int,
+        matches: Callable[[IndexEntry], bool],
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> IndexQuery:
+        """
+        Find the indexed messages of a range that match a predicate, newest first
+
+        ...
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel to look in
+        matches : Callable
+            Whether an entry is targeted, usually built by entry_matcher
+        limit : int, optional, default=None
+            Maximum number of messages to scan, matching or not
+        after_id : int, optional, default=None
+            Only scan messages with a greater id
+        before_id : int, optional, default=None
+            Only scan messages with a smaller id
+
+        Returns
+        -------
+        IndexQuery
+            The matching entries, the number of messages scanned and, when the index
+            doesn't cover the whole range, the id the rest of the range is older than,
+            NEWEST when the rest starts at the newest message of the channel
+        """
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            # Nothing seen in this channel yet, the whole range is a gap
+            return IndexQuery([], 0, NEWEST if before_id is None else before_id)
+
+        found = []
+        scanned = 0
+        for message_id in reversed(channel.entries):
+            if limit is not None and scanned >= limit:
+                return IndexQuery(found, scanned, None)
+            if before_id is not None and message_id >= before_id:
+                continue
+            if after_id is not None and message_id <= after_id:
+                return IndexQuery(found, scanned, None)
+            scanned += 1
+            entry = channel.entries[message_id]
+            if matches(entry):
+                found.append(entry)
+
+        # Reached the oldest indexed message, older ones are only known to history
+        if limit is not None and scanned >= limit:
+            return IndexQuery(found, scanned, None)
+        if after_id is not None and after_id >= channel.oldest_complete - 1:
+            return IndexQuery(found, scanned, None)
+        gap_before = channel.oldest_complete
+        if before_id is not None:
+            gap_before = min(gap_before, before_id)
+        return IndexQuery(found, scanned, gap_before)
+
+    def stats(self) -> Dict:
+        """
+        The number of channels and messages indexed
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Channels and messages indexed
+        """
+        return {
+            "channels": len(self._channels),
+            "messages": sum(len(c.entries) for c in self._channels.values()),
+        }
@@ -0,0 +1,308 @@
+from collections import Counter
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+from .message_index import NEWEST, MessageIndex
+
+
+def last_messages(channel, limit: int) -> AsyncIterator:
+    """
+    Source of the newest messages of a channel
+
+    ...
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        The channel to read
+    limit : int
+        Number of messages to read
+
+    Returns
+    -------
+    AsyncIterator
+        Messages, newest first
+    """
+    return channel.history(limit=limit)
+
+
+async def after_message(channel, message) -> AsyncIterator:
+    """
+    Source of every message sent after a message, followed by that message itself
+
+    ...
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        The channel to read
+    message : discord.Message
+        The oldest message to read
+
+    Yields
+    ------
+    discord.Message
+        Messages, newest first
+    """
+    async for msg in channel.history(limit=None, after=message, oldest_first=False):
+        yield msg
+    yield message
+
+
+def time_range(
+    channel,
+    after: Optional[datetime] = None,
+    before: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> AsyncIterator:
+    """
+    Source of the messages sent between two points in time
+
+    ...
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        The channel to read
+    after : datetime, optional, default=None
+        Only read messages sent after this time
+    before : datetime, optional, default=None
+        Only read messages sent before this time
+    limit : int, optional, default=None
+        Maximum number of messages to read, everything in the range by default
+
+    Returns
+    -------
+    AsyncIterator
+        Messages, newest first
+    """
+    return channel.history(limit=limit, after=after, before=before, oldest_first=False)
+
+
+async def cached_messages(channel, ids: Iterable[int]) -> AsyncIterator:
+    """
+    Source of messages that were already scanned, without reading history
+
+    ...
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        The channel the messages belong to
+    ids : Iterable[int]
+        The message ids, usually from a dry run
+
+    Yields
+    ------
+    discord.PartialMessage
+        A message that can be deleted or have its reactions cleared
+    """
+    for message_id in ids:
+        yield channel.get_partial_message(message_id)
+
+
+class _Snowflake(NamedTuple):
+    id: int
+
+
+class IndexedMessage:
+    """
+    A targeted message found in the message index, deletable without fetching it
+
+    ...
+
+    Attributes
+    ----------
+    id : int
+        The message id
+    author : discord.User or int
+        The author, or their id when they aren't cached
+    created_at : datetime
+        When the message was sent
+    """
+
+    __slots__ = ("id", "author", "created_at", "_partial")
+
+    def __init__(self, partial, author):
+        self.id = partial.id
+        self.author = author
+        self.created_at = partial.created_at
+        self._partial = partial
+
+    async def delete(self):
+        await self._partial.delete()
+
+    async def clear_reactions(self):
+        await self._partial.clear_reactions()
+
+
+async def indexed_history(
+    channel,
+    index: MessageIndex,
+    matches_entry: Callable,
+    matches: Callable,
+    resolve_author: Callable[[int], Any],
+    limit: Optional[int] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+) -> AsyncIterator:
+    """
+    Source of the targeted messages of a range, looked up in the message index and read
+    from history only for the part of the range the index doesn't cover
+
+    Unlike the other sources every message it yields is already targeted.
+
+    ...
+
+    Parameters
+    ----------
+    channel : discord.abc.Messageable
+        The channel to prune
+    index : MessageIndex
+        The message index fed by gateway events
+    matches_entry : Callable
+        Whether an index entry is targeted, built by entry_matcher
+    matches : Callable
+        Whether a fetched message is targeted, usually PrunePredicate.matches
+    resolve_author : Callable
+        Turns an author id into the author reported for index hits
+    limit : int, optional, default=None
+        Maximum number of messages to scan, matching or not
+    after_id : int, optional, default=None
+        Only scan messages with a greater id
+    before_id : int, optional, default=None
+        Only scan messages with a smaller id
+
+    Yields
+    ------
+    IndexedMessage or discord.Message
+        Targeted messages, newest first
+    """
+    result = index.query(channel.id, matches_entry, limit, after_id, before_id)
+    for entry in result.matches:
+        yield IndexedMessage(
+            channel.get_partial_message(entry.id), resolve_author(entry.author_id)
+        )
+    if result.gap_before is None:
+        return
+
+    remaining = None if limit is None else limit - result.scanned
+    gap_before = None if result.gap_before == NEWEST else _Snowflake(result.gap_before)
+    async for msg in channel.history(
+        limit=remaining,
+        before=gap_before,
+        after=_Snowflake(after_id) if after_id is not None else None,
+        oldest_first=False,
+    ):
+        if matches(msg):
+            yield msg
+
+
+class DryRunSink:
+    """
+    A sink that only counts the messages a prune would affect
+
+    ...
+
+    Attributes
+    ----------
+    explain : Callable, optional
+        Names the rules a message matched, usually PrunePredicate.explain
+    matched : int
+        Number of messages received
+    ids : List[int]
+        The ids of the messages received, in the order they were received
+    per_rule : Counter
+        Number of messages each rule matched
+
+    Methods
+    -------
+    put(msg)
+        Count a message
+    stats()
+        The number of messages counted
+    """
+
+    def __init__(self, explain: Optional[Callable[..., List[str]]] = None):
+        self.explain = explain
+        self.matched = 0
+        self.ids = []
+        self.per_rule = Counter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def put(self, msg):
+        self.matched += 1
+        self.ids.append(msg.id)
+        if self.explain is not None:
+            self.per_rule.update(self.explain(msg))
+
+    def stats(self) -> Dict:
+        return {"matched": self.matched, "per_rule": self.per_rule}
+
+
+async def run_prune(
+    source: AsyncIterator,
+    matches: Callable,
+    sink,
+    exclude: Iterable[int] = (),
+    on_fetched: Optional[Callable[[int], Awaitable]] = None,
+    count_authors: bool = True,
+) -> Counter:
+    """
+    Stream every message of a source through a predicate into a sink
+
+    Messages are handed over one at a time and the sinks use bounded queues, so memory
+    stays the same however many messages the source produces.
+
+    ...
+
+    Parameters
+    ----------
+    source : AsyncIterator
+        Produces the messages to check
+    matches : Callable
+        Whether a message is targeted, usually PrunePredicate.matches
+    sink : PruneDeleter, ReactionClearer or DryRunSink
+        Receives every targeted message
+    exclude : Iterable[int], optional, default=()
+        Message ids that are never targeted, such as the prune results message
+    on_fetched : Callable, optional, default=None
+        Awaited with the number of targeted messages once the source is exhausted,
+        while the sink may still be working
+    count_authors : bool, optional, default=True
+        Whether to count messages per author, partial messages don't know their author
+
+    Returns
+    -------
+    Counter
+        Number of targeted messages per author
+    """
+    exclude = frozenset(exclude)
+    per_author = Counter()
+    targeted = 0
+    async with sink:
+        async for msg in source:
+            if msg.id in exclude or not matches(msg):
+                continue
+            await sink.put(msg)
+            targeted += 1
+            if count_authors:
+                per_author[msg.author] += 1
+        if on_fetched is not None:
+            await on_fetched(targeted)
+    return per_author
@@ -0,0 +1,153 @@
+import re
+from typing import Callable, List, Optional
+
+# The optional scheme, www and invite code of the full invite link never decide whether a
+# message contains one, searching for the required part alone finds the same messages
+INVITE_PATTERN = re.compile(
+    r"discord(?:\.gg|\.me|app\.com\/invite|\.com\/invite)\/",
+    re.I,
+)
+
+
+def word_pattern(word: str) -> re.Pattern:
+    """
+    Compile a pattern that finds word as a whole, whitespace separated word
+
+    For a word without whitespace this finds the same messages as checking word in
+    content.split(). A phrase is found when it appears exactly as written between
+    whitespace, which content.split() could never match.
+
+    ...
+
+    Parameters
+    ----------
+    word : str
+        The word or phrase to look for
+
+    Returns
+    -------
+    re.Pattern
+        A pattern that finds word surrounded by whitespace or the ends of the content
+    """
+    return re.compile(rf"(?<!\S){re.escape(word)}(?!\S)")
+
+
+# Every rule's check as an expression of msg, cheapest first. Options are passed in as
+# names when the checks are compiled, never formatted into the source.
+RULE_CHECKS = [
+    ("user", "msg.author.id == user_id"),
+    ("bots", "msg.author.bot"),
+    ("system", "msg.is_system()"),
+    ("attachments", "bool(msg.attachments)"),
+    ("embeds", "bool(msg.embeds)"),
+    # A plain substring test rules out most messages before the word boundaries are checked
+    ("filter", "(filter in msg.content and filter_search(msg.content) is not None)"),
+    ("invites", "invite_search(msg.content) is not None"),
+]
+
+
+class PrunePredicate:
+    """
+    The prune options compiled once into a single check per message
+
+    A message is targeted when any of the enabled rules matches it, or when no rule is
+    enabled at all. The filter is stripped of surrounding whitespace, key and every
+    check built from it use the stripped filter. Pinned messages are skipped before any rule runs unless pinned is set.
+    Only the checks of enabled rules are compiled into matches, in a single function so a
+    message costs one call however many rules are enabled.
+
+    ...
+
+    Attributes
+    ----------
+    rules : List[Callable]
+        One check per enabled rule, cheapest first
+    pinned : bool
+        Whether pinned messages can be targeted
+    matches : Callable
+        The compiled check, whether a message is targeted
+    key : Tuple
+        The options the predicate was built from, equal for equal options
+
+    Methods
+    -------
+    __call__(msg)
+        Whether the message is targeted
+    explain(msg)
+        The names of the rules a message matches
+    """
+
+    def __init__(
+        self,
+        attachments: bool = False,
+        bots: bool = False,
+        embeds: bool = False,
+        filter: Optional[str] = None,
+        invites: bool = False,
+        pinned: bool = False,
+        system: bool = False,
+        user_id: Optional[int] = None,
+    ):
+        filter = filter.strip() or None if filter else None
+        self.pinned = pinned
+        self.key = (attachments, bots, embeds, filter, invites, pinned, system, user_id)
+
+        enabled = {
+            "user": user_id is not None,
+            "bots": bots,
+            "system": system,
+            "attachments": attachments,
+            "embeds": embeds,
+            "filter": bool(filter),
+            "invites": invites,
+        }
+        # The globals of the compiled checks, lambdas look their free names up there
+        self._namespace = {
+            "__builtins__": {"bool": bool},
+            "user_id": user_id,
+            "filter": filter,
+            "filter_search": word_pattern(filter).search if filter else None,
+            "invite_search": INVITE_PATTERN.search,
+        }
+        checks = [(name, check) for name, check in RULE_CHECKS if enabled[name]]
+
+        # One check per enabled rule, only used to explain matches in reports
+        self._named = [(name, self._compile(check)) for name, check in checks]
+        self.rules: List[Callable] = [rule for _, rule in self._named]
+
+        if checks:
+            check = " or ".join(check for _, check in checks)
+        else:
+            check = "True"
+        if not pinned:
+            check = f"not msg.pinned and ({check})"
+        self.matches = self._compile(check)
+
+    def _compile(self, check: str) -> Callable:
+        return eval(f"lambda msg: {check}", self._namespace)
+
+    def __call__(self, msg) -> bool:
+        return self.matches(msg)
+
+    def explain(self, msg) -> List[str]:
+        """
+        The names of the rules a message matches, slower than matches and meant for reports
+
+        ...
+
+        Parameters
+        ----------
+        msg : discord.Message
+            The message to check
+
+        Returns
+        -------
+        List[str]
+            Matching rule names, "all messages" when no rule is enabled and an empty list
+            when the message isn't targeted
+        """
+        if not self.matches(msg):
+            return []
+        if not self._named:
+            return ["all messages"]
+        return [name for name, check in self._named if check(msg)]
@@ -0,0 +1,177 @@
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class ReactionClearer:
+    """
+    Clears the reactions of messages through a small pool of workers
+
+    Every request goes through a shared pacer so the workers together never start more
+    than one request per interval on the clear reactions route, however many of them
+    are waiting on a response.
+
+    ...
+
+    Attributes
+    ----------
+    concurrency : int
+        Number of requests that may be in flight at once
+    interval : float
+        Minimum seconds between the start of two requests
+    on_progress : Callable, optional
+        Awaited with the current stats every progress_interval seconds
+    progress_interval : float
+        Seconds between progress updates
+    cleared : int
+        Number of messages whose reactions were cleared
+    failed : int
+        Number of messages whose reactions couldn't be cleared
+    skipped : int
+        Number of messages that had no reactions to clear
+
+    Methods
+    -------
+    start()
+        Start the workers
+    put(msg)
+        Queue a message to clear the reactions of
+    close()
+        Clear everything still queued and stop the workers
+    stats()
+        Progress and throughput counters
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        interval: float = 0.25,
+        on_progress: Optional[Callable[[Dict], Awaitable]] = None,
+        progress_interval: float = 5.0,
+        max_pending: int = 200,
+    ):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.cleared = 0
+        self.failed = 0
+        self.skipped = 0
+
+        self._queue = asyncio.Queue(max_pending)
+        self._queued = 0
+        self._workers = []
+        self._reporter = None
+        self._pace_lock = asyncio.Lock()
+        self._next_start = 0.0
+        self._started = None
+        self._finished = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        """
+        Start the workers
+        """
+        if self._workers:
+            return
+        self._started = time.monotonic()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        if self.on_progress is not None:
+            self._reporter = asyncio.create_task(self._report())
+
+    async def put(self, msg):
+        """
+        Queue a message to clear the reactions of, waits while the queue is full
+
+        ...
+
+        Parameters
+        ----------
+        msg : discord.Message
+            The message to clear the reactions of
+        """
+        self._queued += 1
+        await self._queue.put(msg)
+
+    async def close(self):
+        """
+        Clear everything still queued and stop the workers
+        """
+        if not self._workers:
+            return
+        for _ in self._workers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._workers)
+        self._workers = []
+        self._finished = time.monotonic()
+        if self._reporter is not None:
+            self._reporter.cancel()
+            self._reporter = None
+
+    async def _pace(self):
+        # Reserve the next start slot, waiting happens outside the lock so slots queue up in order
+        async with self._pace_lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _worker(self):
+        while True:
+            msg = await self._queue.get()
+            if msg is None:
+                return
+            if not getattr(msg, "reactions", True):
+                # Nothing to clear, skip the request entirely, partial messages don't know
+                self.skipped += 1
+                continue
+            await self._pace()
+            try:
+                await msg.clear_reactions()
+                self.cleared += 1
+            except Exception:
+                self.failed += 1
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                await self.on_progress(self.stats())
+            except Exception:
+                # A failed progress update never stops the clearing itself
+                pass
+
+    def stats(self) -> Dict:
+        """
+        Progress and throughput counters
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Messages queued, cleared, failed and skipped, seconds elapsed and messages
+            processed per second
+        """
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.monotonic()) - self._started
+        done = self.cleared + self.failed + self.skipped
+        return {
+            "queued": self._queued,
+            "cleared": self.cleared,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed": elapsed,
+            "per_second": done / elapsed if elapsed else 0.0,
+        }
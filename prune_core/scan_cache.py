@@ -0,0 +1,111 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional
+
+
+class ScanResult(NamedTuple):
+    """The messages a dry run matched, enough to prune them without reading history again."""
+
+    ids: List[int]
+    per_author: Counter
+    created: float
+
+
+class ScanCache:
+    """
+    Keeps the results of recent dry runs for a short time so a real prune with the same
+    options deletes the previewed messages instead of walking history again
+
+    ...
+
+    Attributes
+    ----------
+    ttl : float
+        Seconds a scan stays usable
+    max_entries : int
+        Maximum number of scans kept
+    hits : int
+        Number of prunes that reused a scan
+
+    Methods
+    -------
+    put(key, ids, per_author)
+        Store the results of a scan
+    pop(key)
+        Take a scan out of the cache if it's still fresh
+    stats()
+        The number of scans kept and reused
+    """
+
+    def __init__(self, ttl: float = 120, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+
+        # Ordered from oldest to newest scan
+        self._scans = OrderedDict()
+
+    def _evict_expired(self):
+        expire_before = time.monotonic() - self.ttl
+        while self._scans:
+            key, scan = next(iter(self._scans.items()))
+            if scan.created > expire_before:
+                break
+            del self._scans[key]
+
+    def put(self, key: Hashable, ids: List[int], per_author: Counter):
+        """
+        Store the results of a scan, replacing an older scan with the same key
+
+        ...
+
+        Parameters
+        ----------
+        key : Hashable
+            The channel, source and predicate options of the scan
+        ids : List[int]
+            The ids of the matched messages
+        per_author : Counter
+            Number of matched messages per author
+        """
+        self._evict_expired()
+        self._scans.pop(key, None)
+        self._scans[key] = ScanResult(ids, per_author, time.monotonic())
+        while len(self._scans) > self.max_entries:
+            self._scans.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[ScanResult]:
+        """
+        Take a scan out of the cache if it's still fresh, a scan is only used once
+
+        ...
+
+        Parameters
+        ----------
+        key : Hashable
+            The channel, source and predicate options of the scan
+
+        Returns
+        -------
+        Optional[ScanResult]
+            The scan, None if there's no fresh scan for the key
+        """
+        self._evict_expired()
+        scan = self._scans.pop(key, None)
+        if scan is not None:
+            self.hits += 1
+        return scan
+
+    def stats(self) -> Dict:
+        """
+        The number of scans kept and reused
+
+        ...
+
+        Returns
+        -------
+        Dict
+            Scans currently cached and number of prunes that reused one
+        """
+        self._evict_expired()
+        return {"scans": len(self._scans), "hits": self.hits}
@@ -0,0 +1,122 @@
+import sys
+import time
+import importlib.abc
+from typing import List, NamedTuple
+
+
+class CogTiming(NamedTuple):
+    """How long an extension took to import and to set up, in seconds."""
+
+    name: str
+    import_seconds: float
+    setup_seconds: float
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Times how long one module's code takes to run when it's imported, dependencies included."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != self.name:
+            return None
+        # Let the finders after this one locate the module, only its execution is wrapped
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+
+        exec_module = spec.loader.exec_module
+
+        def timed_exec_module(module):
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                self.seconds = time.perf_counter() - start
+
+        spec.loader.exec_module = timed_exec_module
+        return spec
+
+
+class StartupProfiler:
+    """
+    Times how long every extension takes to import and to set up while the bot starts
+
+    Only load_extension is timed, the extension module is never imported beforehand. An
+    import hook times running the module, including importing its dependencies, and the
+    rest of load_extension is reported as the setup time.
+
+    ...
+
+    Attributes
+    ----------
+    timings : List[CogTiming]
+        The timings of every extension loaded so far, in load order
+
+    Methods
+    -------
+    load(bot, name)
+        Load an extension and record its timing
+    report()
+        A table of every extension's timing, slowest first
+    """
+
+    def __init__(self):
+        self.timings: List[CogTiming] = []
+
+    async def load(self, bot, name: str):
+        """
+        Load an extension and record its timing
+
+        ...
+
+        Parameters
+        ----------
+        bot : commands.Bot
+            The bot to load the extension into
+        name : str
+            The extension to load, i.e. cogs.general
+        """
+        timer = _ImportTimer(name)
+        sys.meta_path.insert(0, timer)
+        try:
+            start = time.perf_counter()
+            await bot.load_extension(name)
+            total = time.perf_counter() - start
+        finally:
+            sys.meta_path.remove(timer)
+        self.timings.append(CogTiming(name, timer.seconds, total - timer.seconds))
+
+    def report(self) -> str:
+        """
+        A table of every extension's timing, slowest first
+
+        ...
+
+        Returns
+        -------
+        str
+            One line per extension followed by the totals
+        """
+        lines = [f"{'extension':<24}{'import ms':>12}{'setup ms':>12}"]
+        for timing in sorted(
+            self.timings, key=lambda t: t.import_seconds + t.setup_seconds, reverse=True
+        ):
+            lines.append(
+                f"{timing.name:<24}{timing.import_seconds * 1000:>12.1f}{timing.setup_seconds * 1000:>12.1f}"
+            )
+        total_import = sum(t.import_seconds for t in self.timings)
+        total_setup = sum(t.setup_seconds for t in self.timings)
+        lines.append(
+            f"{'total':<24}{total_import * 1000:>12.1f}{total_setup * 1000:>12.1f}"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,183 @@
+import os
+import json
+import asyncio
+import hashlib
+import discord
+from discord import app_commands
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+GLOBAL_SCOPE = "global"
+
+
+class ScopeResult(NamedTuple):
+    """The outcome of syncing the commands of one scope."""
+
+    scope: str
+    commands: int
+    error: Optional[str] = None
+
+
+class SyncReport(NamedTuple):
+    """The scopes a sync uploaded, skipped because nothing changed, or failed to upload."""
+
+    synced: List[ScopeResult]
+    skipped: List[ScopeResult]
+    failed: List[ScopeResult]
+
+
+class SyncEngine:
+    """
+    Syncs the command tree to Discord only for the scopes whose commands changed
+
+    The payload of every scope is hashed and compared to the hash of the last successful
+    sync of that scope, kept on disk so it survives restarts. Deleting the file forces
+    the next sync of every scope.
+
+    ...
+
+    Attributes
+    ----------
+    tree : app_commands.CommandTree
+        The command tree to sync
+    path : str
+        JSON file the hash of every synced scope is kept in
+    concurrency : int
+        Maximum number of scopes uploaded at once
+
+    Methods
+    -------
+    payload_hash(guild=None)
+        The hash of the commands a scope would upload
+    sync(guilds=None)
+        Sync the global scope or a list of guilds, uploading only what changed
+    """
+
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        path: str = "./data/command_sync.json",
+        concurrency: int = 3,
+    ):
+        self.tree = tree
+        self.path = path
+        self.concurrency = concurrency
+
+        self._hashes: Optional[Dict[str, str]] = None
+        self._lock = asyncio.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        # Hashes recorded for another application say nothing about this one
+        if state.get("application_id") != self.tree.client.application_id:
+            return {}
+        return state.get("scopes", {})
+
+    def _save(self, hashes: Dict[str, str]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {"application_id": self.tree.client.application_id, "scopes": hashes}
+        # Write then rename so an interrupted write never leaves a broken file behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    async def _payload(self, guild: Optional[discord.abc.Snowflake]) -> List[Dict]:
+        # Built the same way CommandTree.sync builds what it uploads
+        commands = self.tree.get_commands(guild=guild)
+        translator = self.tree.translator
+        if translator:
+            return [
+                await command.get_translated_payload(translator) for command in commands
+            ]
+        return [command.to_dict() for command in commands]
+
+    async def payload_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        """
+        The hash of the commands a scope would upload
+
+        ...
+
+        Parameters
+        ----------
+        guild : discord.abc.Snowflake, optional, default=None
+            The guild to hash the commands of, the global commands by default
+
+        Returns
+        -------
+        str
+            A hex digest that changes whenever anything in the scope's payload changes
+        """
+        payload = await self._payload(guild)
+        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    async def _sync_scope(
+        self,
+        guild: Optional[discord.abc.Snowflake],
+        semaphore: asyncio.Semaphore,
+        report: SyncReport,
+    ):
+        scope = GLOBAL_SCOPE if guild is None else str(guild.id)
+        commands = len(self.tree.get_commands(guild=guild))
+        try:
+            digest = await self.payload_hash(guild)
+        except Exception as e:
+            report.failed.append(ScopeResult(scope, commands, str(e)))
+            return
+        if self._hashes.get(scope) == digest:
+            report.skipped.append(ScopeResult(scope, commands))
+            return
+
+        async with semaphore:
+            try:
+                await self.tree.sync(guild=guild)
+            except (discord.HTTPException, app_commands.AppCommandError) as e:
+                report.failed.append(ScopeResult(scope, commands, str(e)))
+                return
+
+        async with self._lock:
+            self._hashes[scope] = digest
+            try:
+                await asyncio.to_thread(self._save, dict(self._hashes))
+            except OSError as e:
+                # The upload went through, only skipping it next time won't work
+                report.failed.append(
+                    ScopeResult(scope, commands, f"synced but not recorded: {e}")
+                )
+                return
+        report.synced.append(ScopeResult(scope, commands))
+
+    async def sync(
+        self, guilds: Optional[Iterable[discord.abc.Snowflake]] = None
+    ) -> SyncReport:
+        """
+        Sync the global scope or a list of guilds, uploading only what changed
+
+        ...
+
+        Parameters
+        ----------
+        guilds : Iterable[discord.abc.Snowflake], optional, default=None
+            The guilds to sync, the global commands by default
+
+        Returns
+        -------
+        SyncReport
+            The scopes that were synced, skipped and failed
+        """
+        if self._hashes is None:
+            self._hashes = await asyncio.to_thread(self._load)
+
+        scopes = [None] if guilds is None else list(guilds)
+        report = SyncReport([], [], [])
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(self._sync_scope(guild, semaphore, report) for guild in scopes)
+        )
+        return report
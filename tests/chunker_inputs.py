@@ -0,0 +1,29 @@
+"""Random chatbot replies shared by tests/test_chunker.py and benchmarks/chunker_bench.py."""
+
+import random
+
+from gpt_core.chunker import FENCE
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "x" * 40]
+SEPARATORS = [" ", " ", " ", ". ", "! ", "? ", "\n", "\n\n"]
+
+
+def random_text(rng: random.Random, size: int) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.03:
+            lines = "\n".join(
+                "    " + " ".join(rng.choices(WORDS, k=rng.randint(1, 8)))
+                for _ in range(rng.randint(1, 40))
+            )
+            tag = rng.choice(["", "py", "x" * 30])
+            part = f"\n{FENCE}{tag}\n{lines}\n{FENCE}\n"
+        elif roll < 0.05:
+            part = "`" * rng.randint(1, 7)
+        else:
+            part = rng.choice(WORDS) + rng.choice(SEPARATORS)
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bot runs from the repository root, its packages are imported from there
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from chunker_inputs import random_text
+from gpt_core.chunker import FENCE, FENCE_PATTERN, next_chunk, split_message
+
+LIMITS = [20, 40, 100, 2000]
+
+
+def walk(text: str, limit: int):
+    """Every chunk with the fence open before it, the fence it leaves open and the text it consumed."""
+    position = 0
+    fence = None
+    while position < len(text):
+        start = position
+        chunk, position, fence_after = next_chunk(text, position, fence, limit)
+        assert position > start, "no progress"
+        yield chunk, fence, fence_after, text[start:position]
+        fence = fence_after
+
+
+def unwrap(chunk: str, fence_before, fence_after) -> str:
+    """A chunk without the code fences added to reopen and close code blocks."""
+    if fence_before:
+        chunk = chunk.split("\n", 1)[1] if "\n" in chunk else ""
+    if fence_after:
+        chunk = chunk[: -len(FENCE) - 1]
+    return chunk
+
+
+def random_cases(count: int):
+    rng = random.Random(0)
+    for _ in range(count):
+        limit = rng.choice(LIMITS)
+        yield random_text(rng, rng.randint(0, 6000)), limit
+
+
+CASES = list(random_cases(300))
+
+
+@pytest.mark.parametrize("text,limit", CASES)
+def test_chunks_fit_the_limit(text, limit):
+    for chunk in split_message(text, limit):
+        assert 0 < len(chunk) <= limit
+
+
+@pytest.mark.parametrize("text,limit", CASES)
+def test_code_blocks_balanced_in_every_chunk(text, limit):
+    for chunk in split_message(text, limit):
+        assert len(FENCE_PATTERN.findall(chunk)) % 2 == 0
+
+
+@pytest.mark.parametrize("text,limit", CASES)
+def test_concatenated_chunks_equal_the_input(text, limit):
+    spans = []
+    for chunk, fence_before, fence_after, span in walk(text, limit):
+        # Only whitespace at a boundary is dropped from a chunk
+        assert unwrap(chunk, fence_before, fence_after) == span.rstrip()
+        spans.append(span)
+    assert "".join(spans) == text
+
+
+@pytest.mark.parametrize("text,limit", CASES)
+def test_split_message_yields_the_non_empty_chunks(text, limit):
+    expected = [chunk for chunk, *_ in walk(text, limit) if chunk.strip()]
+    assert list(split_message(text, limit)) == expected
+
+
+@pytest.mark.parametrize("limit", LIMITS)
+@pytest.mark.parametrize("text", ["a" * 9000, "`" * 9000, "\n" * 9000, "ab`" * 3000])
+def test_text_without_spaces(text, limit):
+    chunks = list(split_message(text, limit))
+    assert all(len(chunk) <= limit for chunk in chunks)
+    assert "".join(chunks).replace("\n", "").replace(FENCE, "") == text.replace(
+        "\n", ""
+    ).replace(FENCE, "")
+
+
+def test_short_text_is_one_chunk():
+    assert list(split_message("hello world", 2000)) == ["hello world"]
+
+
+def test_code_block_is_reopened_with_its_language():
+    text = f"{FENCE}py\n" + "print(1)\n" * 50 + FENCE
+    chunks = list(split_message(text, 100))
+    assert len(chunks) > 1
+    assert all(chunk.startswith(f"{FENCE}py\n") for chunk in chunks)
@@ -0,0 +1,30 @@
+import asyncio
+
+from gpt_core.cache import CompletionCache
+
+
+def stored_keys(cache):
+    return {key for key, in cache._db.execute("SELECT key FROM completions")}
+
+
+def test_expired_responses_are_pruned_every_few_writes(tmp_path):
+    cache = CompletionCache(ttl=60, path=str(tmp_path / "cache.sqlite3"), prune_every=3)
+    cache._db_set("old", "response", 0)
+    cache._db_set("stale", "response", 0)
+    assert stored_keys(cache) == {"stale"}
+
+    async def scenario():
+        await cache.set("a", "response")
+        assert "stale" in stored_keys(cache)
+        await cache.set("b", "response")
+        assert stored_keys(cache) == {"a", "b"}
+
+    asyncio.run(scenario())
+
+
+def test_backing_store_is_indexed_by_creation_time(tmp_path):
+    cache = CompletionCache(path=str(tmp_path / "cache.sqlite3"))
+    plan = cache._db.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM completions WHERE created<?", (0,)
+    ).fetchall()
+    assert any("completions_created" in row[-1] for row in plan)
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import db_helper
+from db_helper import GuildWriteQueue
+
+
+class FailingSql:
+    """Stands in for AsyncSqlHelper, the first write fails after events arrived meanwhile."""
+
+    writes = []
+    during_write = None
+    fail = True
+
+    async def run(self, func, upserts, renames, deletes):
+        if FailingSql.during_write is not None:
+            FailingSql.during_write()
+            FailingSql.during_write = None
+        if FailingSql.fail:
+            FailingSql.fail = False
+            raise RuntimeError("database unavailable")
+        FailingSql.writes.append((upserts, renames, deletes))
+
+
+@pytest.fixture
+def sql(monkeypatch):
+    FailingSql.writes = []
+    FailingSql.during_write = None
+    FailingSql.fail = True
+    monkeypatch.setattr(db_helper, "AsyncSqlHelper", FailingSql)
+    return FailingSql
+
+
+def run_flushes(queue):
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await queue.flush()
+        await queue.flush()
+
+    asyncio.run(scenario())
+
+
+def test_rename_during_failed_add_keeps_the_add(sql):
+    queue = GuildWriteQueue()
+    queue._queue(1, "add", "old name")
+    sql.during_write = lambda: queue._queue(1, "rename", "new name")
+    run_flushes(queue)
+    assert sql.writes == [([("new name", 1)], [], [])]
+
+
+def test_delete_during_failed_add_wins(sql):
+    queue = GuildWriteQueue()
+    queue._queue(1, "add", "name")
+    sql.during_write = lambda: queue._queue(1, "delete")
+    run_flushes(queue)
+    assert sql.writes == [([], [], [1])]
+
+
+def test_failed_batch_is_requeued_as_is(sql):
+    queue = GuildWriteQueue()
+    queue._queue(1, "rename", "name")
+    queue._queue(2, "delete")
+    run_flushes(queue)
+    assert sql.writes == [([], [("name", 1)], [2])]
+
+
+def test_guild_that_left_and_joined_again_is_deleted_then_added(sql):
+    sql.fail = False
+    queue = GuildWriteQueue()
+    queue._queue(1, "delete")
+    queue._queue(1, "add", "name")
+    asyncio.run(queue.flush())
+    assert sql.writes == [([("name", 1)], [], [1])]
+
+
+def test_join_during_failed_delete_resets_the_guild(sql):
+    queue = GuildWriteQueue()
+    queue._queue(1, "delete")
+    sql.during_write = lambda: queue._queue(1, "add", "name")
+    run_flushes(queue)
+    assert sql.writes == [([("name", 1)], [], [1])]
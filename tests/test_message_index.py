@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from prune_core.message_index import NEWEST, MessageIndex, entry_matcher
+from prune_core.pipeline import indexed_history
+from prune_core.predicate import PrunePredicate
+
+DISCORD_EPOCH = 1420070400000
+
+
+def make_message(message_id, channel_id=1, author_id=10, content="hello"):
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=channel_id),
+        author=SimpleNamespace(id=author_id, bot=False),
+        content=content,
+        attachments=[],
+        embeds=[],
+        pinned=False,
+        is_system=lambda: False,
+    )
+
+
+class FakeChannel:
+    """A channel whose history is a list of messages, newest first."""
+
+    def __init__(self, messages, channel_id=1):
+        self.id = channel_id
+        self.messages = messages
+        self.history_calls = []
+
+    async def history(self, limit=None, before=None, after=None, oldest_first=False):
+        self.history_calls.append({"limit": limit, "before": before, "after": after})
+        yielded = 0
+        for msg in self.messages:
+            if before is not None and msg.id >= before.id:
+                continue
+            if after is not None and msg.id <= after.id:
+                continue
+            if limit is not None and yielded >= limit:
+                return
+            yielded += 1
+            yield msg
+
+    def get_partial_message(self, message_id):
+        created = datetime.fromtimestamp(
+            ((message_id >> 22) + DISCORD_EPOCH) / 1000, tz=timezone.utc
+        )
+        return SimpleNamespace(id=message_id, created_at=created)
+
+
+async def collect(source):
+    return [msg async for msg in source]
+
+
+def run_indexed(index, channel, limit=None, after_id=None, before_id=None):
+    predicate = PrunePredicate()
+    return asyncio.run(
+        collect(
+            indexed_history(
+                channel,
+                index,
+                entry_matcher(predicate),
+                predicate.matches,
+                lambda author_id: author_id,
+                limit=limit,
+                after_id=after_id,
+                before_id=before_id,
+            )
+        )
+    )
+
+
+def test_unindexed_channel_is_one_gap_from_newest():
+    index = MessageIndex()
+    result = index.query(1, lambda entry: True, limit=5)
+    assert result.matches == []
+    assert result.gap_before == NEWEST
+
+
+def test_unindexed_channel_keeps_before_bound():
+    index = MessageIndex()
+    assert index.query(1, lambda entry: True, before_id=500).gap_before == 500
+
+
+def test_amount_prune_of_unindexed_channel_reads_history():
+    channel = FakeChannel(
+        [make_message(i) for i in range(100 << 22, 90 << 22, -(1 << 22))]
+    )
+    found = run_indexed(MessageIndex(), channel, limit=5)
+    assert len(found) == 5
+    assert channel.history_calls[0]["before"] is None
+
+
+def test_indexed_messages_are_answered_without_history():
+    index = MessageIndex()
+    messages = [make_message(i << 22) for i in range(1, 11)]
+    for msg in messages:
+        index.add(msg)
+    channel = FakeChannel(list(reversed(messages)))
+    found = run_indexed(index, channel, limit=5)
+    assert [msg.id for msg in found] == [i << 22 for i in range(10, 5, -1)]
+    assert channel.history_calls == []
+
+
+def test_history_gap_starts_at_oldest_indexed_message():
+    index = MessageIndex()
+    history = [make_message(i << 22) for i in range(20, 0, -1)]
+    # Only the 5 newest messages were seen through the gateway
+    for msg in reversed(history[:5]):
+        index.add(msg)
+    channel = FakeChannel(history)
+    found = run_indexed(index, channel, limit=8)
+    assert [msg.id for msg in found] == [i << 22 for i in range(20, 12, -1)]
+    assert channel.history_calls[0]["before"].id == 16 << 22
+
+
+def test_index_and_predicate_agree_on_a_padded_filter():
+    predicate = PrunePredicate(filter="  spam ")
+    matches = entry_matcher(predicate)
+    index = MessageIndex()
+    spam = make_message(1 << 22, content="buy spam now")
+    other = make_message(2 << 22, content="hello")
+    for msg in (spam, other):
+        index.add(msg)
+    found = [entry.id for entry in index.query(1, matches).matches]
+    assert found == [spam.id]
+    assert predicate(spam) and not predicate(other)
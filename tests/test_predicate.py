@@ -0,0 +1,78 @@
+import itertools
+from types import SimpleNamespace
+
+from prune_core.predicate import PrunePredicate
+
+
+def message(**fields):
+    defaults = {
+        "author": SimpleNamespace(id=1, bot=False),
+        "content": "hello there",
+        "pinned": False,
+        "attachments": [],
+        "embeds": [],
+        "system": False,
+    }
+    defaults.update(fields)
+    system = defaults.pop("system")
+    return SimpleNamespace(is_system=lambda: system, **defaults)
+
+
+MESSAGES = [
+    message(),
+    message(pinned=True),
+    message(author=SimpleNamespace(id=7, bot=False)),
+    message(author=SimpleNamespace(id=2, bot=True)),
+    message(system=True),
+    message(attachments=[object()]),
+    message(embeds=[object()]),
+    message(content="some spam here"),
+    message(content="spammy"),
+    message(content="join discord.gg/abc"),
+]
+
+OPTIONS = {
+    "attachments": True,
+    "bots": True,
+    "embeds": True,
+    "filter": "spam",
+    "invites": True,
+    "system": True,
+    "user_id": 7,
+}
+
+
+def expected(msg, pinned=False, **options):
+    if msg.pinned and not pinned:
+        return False
+    checks = {
+        "attachments": bool(msg.attachments),
+        "bots": msg.author.bot,
+        "embeds": bool(msg.embeds),
+        "filter": options.get("filter") in msg.content.split(),
+        "invites": "discord.gg/" in msg.content,
+        "system": msg.is_system(),
+        "user_id": msg.author.id == options.get("user_id"),
+    }
+    return not options or any(checks[name] for name in options)
+
+
+def test_only_enabled_rules_target_messages():
+    for count in range(len(OPTIONS) + 1):
+        for names in itertools.combinations(OPTIONS, count):
+            options = {name: OPTIONS[name] for name in names}
+            for pinned in (False, True):
+                predicate = PrunePredicate(pinned=pinned, **options)
+                for msg in MESSAGES:
+                    assert predicate(msg) == expected(msg, pinned, **options), (
+                        options,
+                        pinned,
+                        msg,
+                    )
+                    assert bool(predicate.explain(msg)) == predicate(msg)
+
+
+def test_options_are_never_part_of_the_compiled_source():
+    predicate = PrunePredicate(filter="') or True or ('")
+    assert not predicate(message())
+    assert predicate(message(content="x ') or True or (' y"))
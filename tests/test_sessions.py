@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from gpt_core import gpt_utils
+from gpt_core.gpt_mode import ChatGPT
+from gpt_core.sessions import InputTooLong, SessionStore
+
+
+def word_count(message):
+    return len(message["content"].split())
+
+
+def new_store(**limits):
+    return SessionStore(
+        lambda: [{"role": "system", "content": "be nice"}], word_count, **limits
+    )
+
+
+def test_trim_refuses_a_newest_message_over_budget():
+    session = new_store().get("channel")
+    session.append({"role": "user", "content": "one two"})
+    session.append({"role": "user", "content": "one two three four five six"})
+    assert not session.trim(token_budget=5, max_messages=20)
+    assert len(session.history) == 2
+    assert session.trim(token_budget=8, max_messages=20)
+    assert len(session.history) == 1
+
+
+def test_input_too_long_is_rejected_and_forgotten():
+    gpt = ChatGPT()
+    gpt.cache_mode = "off"
+
+    async def ask_openai(messages, stream=False):
+        raise AssertionError("an oversize request must not reach the api")
+
+    gpt.ask_openai = ask_openai
+    budget = gpt_utils.token_budget(gpt.model, gpt.max_tokens)
+    before = list(gpt.sessions.get("channel").messages)
+    with pytest.raises(InputTooLong) as error:
+        asyncio.run(gpt.gpt_text("channel", "word " * budget * 4))
+    assert error.value.budget == budget
+    assert error.value.tokens > budget
+    assert gpt.sessions.get("channel").messages == before
+
+
+def test_fallback_count_doesnt_undercount_cjk(monkeypatch):
+    monkeypatch.setattr(gpt_utils, "tiktoken", None)
+    gpt_utils._encoding_for.cache_clear()
+    try:
+        # Every CJK character is at least one token, the estimate mustn't count fewer
+        text = "你好世界" * 50
+        count = gpt_utils.count_tokens({"role": "user", "content": text})
+        assert count >= len(text) + gpt_utils.TOKENS_PER_MESSAGE
+    finally:
+        gpt_utils._encoding_for.cache_clear()
+
+
+def test_sessions_in_use_are_not_evicted():
+    async def scenario():
+        store = new_store(max_sessions=1, idle_ttl=60)
+        busy = store.get("busy")
+        async with busy.lock:
+            busy.last_used -= 120
+            store.get("other")
+            assert store.get("busy") is busy
+        store.get("other")
+        assert store.stats()["sessions"] == 1
+        assert store.get("other") is not busy
+
+    asyncio.run(scenario())
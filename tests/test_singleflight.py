@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from gpt_core.gpt_mode import ChatGPT
+from gpt_core.singleflight import FlightAbandoned, SingleFlight
+
+
+def test_joined_callers_get_the_leaders_error():
+    async def scenario():
+        flights = SingleFlight()
+        with pytest.raises(ValueError):
+            with flights.lead("key"):
+                follower = asyncio.ensure_future(flights.join("key"))
+                await asyncio.sleep(0)
+                raise ValueError("upstream failed")
+        with pytest.raises(ValueError):
+            await follower
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_doesnt_cancel_joined_callers():
+    async def scenario():
+        flights = SingleFlight()
+        joined = asyncio.Event()
+
+        async def leader():
+            with flights.lead("key"):
+                joined.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(leader())
+        await joined.wait()
+        follower = asyncio.ensure_future(flights.join("key"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(FlightAbandoned):
+            await follower
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_follower_asks_on_its_own_when_the_leading_stream_is_abandoned():
+    async def scenario():
+        gpt = ChatGPT()
+        gpt.cache_mode = "all"
+        calls = []
+
+        async def ask_openai(messages, stream=False):
+            calls.append(stream)
+            if not stream:
+                return {
+                    "choices": [{"message": {"content": "own answer"}}],
+                    "usage": {"total_tokens": 5},
+                }
+
+            async def chunks():
+                yield {"choices": [{"delta": {"content": "partial"}}]}
+                await asyncio.sleep(10)
+
+            return chunks()
+
+        gpt.ask_openai = ask_openai
+
+        stream = gpt.gpt_text_stream("channel:1", "same question")
+        assert await stream.__anext__() == "partial"
+        follower = asyncio.ensure_future(gpt.gpt_text("channel:2", "same question"))
+        await asyncio.sleep(0.05)
+        assert not follower.done()
+
+        # The user of the leading stream goes away mid answer
+        await stream.aclose()
+        assert await asyncio.wait_for(follower, 1) == "own answer"
+        assert calls == [True, False]
+
+    asyncio.run(scenario())
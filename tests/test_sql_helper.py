@@ -0,0 +1,41 @@
+import pytest
+
+import db_helper
+from db_helper import SqlHelper
+
+
+class BrokenConnection:
+    def cursor(self):
+        raise db_helper.database.errors.OperationalError("connection lost")
+
+
+class FakePool:
+    def __init__(self):
+        self.connection = BrokenConnection()
+        self.released = []
+
+    def get_connection(self):
+        return self.connection
+
+    def release(self, con):
+        self.released.append(con)
+
+
+def test_connection_is_released_when_no_cursor_can_be_opened(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(db_helper, "get_pool", lambda: pool)
+    with pytest.raises(db_helper.database.errors.OperationalError):
+        SqlHelper()
+    assert pool.released == [pool.connection]
+
+
+def test_readding_a_cached_guild_takes_the_new_name():
+    cache = db_helper.GuildCache()
+    cache.add_guild("old name", 1)
+    cache.set_prefix(1, "!")
+    cache.add_guild("new name", 1)
+    assert cache.guilds[1] == {
+        "guild_name": "new name",
+        "prefix": "!",
+        "member_count_channel_id": None,
+    }
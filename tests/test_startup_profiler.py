@@ -0,0 +1,35 @@
+import asyncio
+import sys
+
+import discord
+from discord.ext import commands
+
+from startup_profiler import StartupProfiler
+
+
+def test_extension_runs_once_and_both_phases_are_timed(tmp_path, monkeypatch):
+    runs = tmp_path / "runs.txt"
+    (tmp_path / "profiled_ext.py").write_text(f"""import time
+with open({str(runs)!r}, "a") as file:
+    file.write("run\\n")
+time.sleep(0.02)
+
+
+async def setup(bot):
+    time.sleep(0.01)
+""")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "profiled_ext", raising=False)
+
+    async def scenario():
+        bot = commands.Bot(command_prefix="?", intents=discord.Intents.none())
+        profiler = StartupProfiler()
+        meta_path = list(sys.meta_path)
+        await profiler.load(bot, "profiled_ext")
+        assert sys.meta_path == meta_path
+        return profiler.timings
+
+    [timing] = asyncio.run(scenario())
+    assert runs.read_text() == "run\n"
+    assert timing.import_seconds >= 0.02
+    assert timing.setup_seconds >= 0.01
@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+from cogs.chatbot import EMPTY_REPLY, StreamingReply
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+    async def edit(self, content):
+        self.content = content
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content):
+        message = FakeMessage(content)
+        self.messages.append(message)
+        return message
+
+
+def stream(parts):
+    async def scenario():
+        followup = FakeFollowup()
+        reply = StreamingReply(SimpleNamespace(followup=followup), edit_interval=0)
+        for part in parts:
+            await reply.write(part)
+        await reply.finish()
+        return [message.content for message in followup.messages]
+
+    return asyncio.run(scenario())
+
+
+def test_empty_stream_sends_a_fallback():
+    assert stream([]) == [EMPTY_REPLY]
+
+
+def test_whitespace_only_stream_sends_a_fallback():
+    assert stream([" ", "\n"]) == [EMPTY_REPLY]
+
+
+def test_streamed_text_is_shown_without_fallback():
+    assert stream(["Hello", " world"]) == ["Hello world"]
+
+
+def test_long_stream_continues_in_new_messages():
+    messages = stream(["word " * 100] * 10)
+    assert len(messages) > 1
+    assert all(0 < len(message) <= 2000 for message in messages)
+    assert EMPTY_REPLY not in messages
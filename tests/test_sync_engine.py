@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from sync_engine import SyncEngine
+
+
+class FakeCommand:
+    def __init__(self, name):
+        self.name = name
+
+    def to_dict(self):
+        return {"name": self.name, "description": "…", "options": []}
+
+
+class FakeTree:
+    """A command tree that records uploads instead of talking to Discord."""
+
+    def __init__(self, names):
+        self.client = SimpleNamespace(application_id=42)
+        self.translator = None
+        self.names = names
+        self.uploads = []
+
+    def get_commands(self, guild=None):
+        return [FakeCommand(name) for name in self.names]
+
+    async def sync(self, guild=None):
+        self.uploads.append(guild)
+        return []
+
+
+def test_unchanged_scopes_are_skipped_across_restarts(tmp_path):
+    path = str(tmp_path / "command_sync.json")
+    tree = FakeTree(["help", "ping"])
+    guilds = [discord.Object(i) for i in range(1, 6)]
+
+    report = asyncio.run(SyncEngine(tree, path=path).sync(guilds))
+    assert len(report.synced) == 5 and not report.skipped and not report.failed
+
+    report = asyncio.run(SyncEngine(tree, path=path).sync(guilds))
+    assert len(report.skipped) == 5 and not report.synced
+    assert len(tree.uploads) == 5
+
+    tree.names.append("prune")
+    report = asyncio.run(SyncEngine(tree, path=path).sync(guilds))
+    assert len(report.synced) == 5
+
+
+def test_failed_save_is_reported_without_aborting_other_scopes(tmp_path):
+    # A directory where the state file should be makes every save fail
+    path = tmp_path / "command_sync.json"
+    path.mkdir()
+    tree = FakeTree(["help"])
+    guilds = [discord.Object(i) for i in range(1, 4)]
+
+    report = asyncio.run(SyncEngine(tree, path=str(path)).sync(guilds))
+    assert len(tree.uploads) == 3
+    assert len(report.failed) == 3
+    assert all("synced but not recorded" in result.error for result in report.failed)